@@ -1,5 +1,10 @@
+import asyncio
 import json
+from channels.consumer import AsyncConsumer
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from .events import contiguous_runs, merge_seat_deltas
 
 
 class SeatConsumer(AsyncWebsocketConsumer):
@@ -19,7 +24,42 @@ class SeatConsumer(AsyncWebsocketConsumer):
                 {
                     "type": "seat_update",
                     "sessionId": event["session_id"],
-                    "takenSeats": event["taken_seats"],
+                    "baseVersion": event["base_version"],
+                    "version": event["version"],
+                    "taken": event["taken"],
+                    "released": event["released"],
                 }
             )
         )
+
+
+class SeatBroadcastConsumer(AsyncConsumer):
+    """
+    Worker on the seat broadcast channel. Collects the seat deltas of each
+    session for SEAT_BROADCAST_WINDOW seconds and sends them to the session
+    group merged, one message per run of consecutive versions.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending = {}
+        self.flushes = set()
+
+    async def seat_delta(self, event):
+        session_id = event["session_id"]
+        if session_id not in self.pending:
+            self.pending[session_id] = []
+            flush = asyncio.create_task(self.flush(session_id))
+            self.flushes.add(flush)
+            flush.add_done_callback(self.flushes.discard)
+        self.pending[session_id].append(event)
+
+    async def flush(self, session_id):
+        await asyncio.sleep(settings.SEAT_BROADCAST_WINDOW)
+        deltas = self.pending.pop(session_id)
+        # пропуск версий (их получил другой воркер) — отдельное сообщение,
+        # чтобы клиент увидел разрыв и перечитал схему
+        for run in contiguous_runs(deltas):
+            await self.channel_layer.group_send(
+                f"session_{session_id}", merge_seat_deltas(run)
+            )
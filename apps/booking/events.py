@@ -0,0 +1,114 @@
+"""
+Seat change notifications for the ``session_<public_id>`` WebSocket groups.
+
+Messages carry only the seats that became taken or were released, plus a
+per-session version that grows by one with every change. Deltas first go to
+the SeatBroadcastConsumer worker, which merges the changes of a hot session
+over a short window into group messages covering ``base_version`` ..
+``version``, one per run of consecutive versions the worker received. A client whose own version is behind ``base_version`` has
+missed a delta and should resync from SessionSeatsView, which returns the
+version its snapshot is based on. The same version keys the cached
+SessionSeatsView responses and their ETags.
+"""
+
+from asgiref.sync import async_to_sync
+from channels.exceptions import ChannelFull
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from apps.common.redis_client import get_redis
+from apps.schedule.layout import hall_seat_index
+
+
+def _version_key(session_key):
+    return f"seat_version:{session_key}"
+
+
+def seat_version(session_key):
+    version = get_redis().get(_version_key(session_key))
+    return int(version) if version else 0
+
+
+def _coordinates(session, seat_ids):
+    seat_ids = set(seat_ids)
+    return [
+        {"row_number": row_number, "seat_number": seat_number}
+        for seat_id, row_number, seat_number in hall_seat_index(session.hall)["seats"]
+        if seat_id in seat_ids
+    ]
+
+
+def publish_seat_delta(session, taken=(), released=()):
+    """
+    Hands the seats that became taken or free to the broadcast coalescer.
+    Falls back to a direct group send if the coalescer is not keeping up.
+    The version is assigned here, so callers must be the session's single
+    writer (relay_seat_events holds its advisory lock).
+    """
+    if not taken and not released:
+        return
+    version = get_redis().incr(_version_key(session.public_id))
+    delta = {
+        "type": "seat.delta",
+        "session_id": str(session.public_id),
+        "version": version,
+        "taken": _coordinates(session, taken),
+        "released": _coordinates(session, released),
+    }
+
+    channel_layer = get_channel_layer()
+    try:
+        async_to_sync(channel_layer.send)(settings.SEAT_BROADCAST_CHANNEL, delta)
+    except ChannelFull:
+        async_to_sync(channel_layer.group_send)(
+            f"session_{session.public_id}", merge_seat_deltas([delta])
+        )
+
+
+def contiguous_runs(deltas):
+    """
+    Splits deltas of one session into runs of consecutive versions. With
+    several broadcast workers each sees only part of the versions, and a
+    merged message must not claim to cover versions it never saw.
+    """
+    runs = []
+    for delta in sorted(deltas, key=lambda delta: delta["version"]):
+        if runs and delta["version"] == runs[-1][-1]["version"] + 1:
+            runs[-1].append(delta)
+        else:
+            runs.append([delta])
+    return runs
+
+
+def merge_seat_deltas(deltas):
+    """
+    Folds deltas of one session with consecutive versions into a single
+    ``seat_update`` message. The last change to a seat wins; ``base_version``
+    is the version the merged delta applies on top of.
+    """
+    deltas = sorted(deltas, key=lambda delta: delta["version"])
+    versions = [delta["version"] for delta in deltas]
+    if versions != list(range(versions[0], versions[0] + len(versions))):
+        raise ValueError(f"Seat delta versions are not contiguous: {versions}")
+    seats = {}
+    for delta in deltas:
+        for seat in delta["taken"]:
+            seats[(seat["row_number"], seat["seat_number"])] = True
+        for seat in delta["released"]:
+            seats[(seat["row_number"], seat["seat_number"])] = False
+
+    def coordinates(taken):
+        return [
+            {"row_number": row_number, "seat_number": seat_number}
+            for (row_number, seat_number), is_taken in sorted(seats.items())
+            if is_taken is taken
+        ]
+
+    return {
+        "type": "seat_update",
+        "session_id": deltas[0]["session_id"],
+        "base_version": deltas[0]["version"] - 1,
+        "version": deltas[-1]["version"],
+        "taken": coordinates(True),
+        "released": coordinates(False),
+    }
@@ -0,0 +1,30 @@
+"""
+Expiry schedule for pending bookings.
+
+Every pending booking is a member of one Redis sorted set scored by its
+``expires_at`` timestamp. A periodic sweeper pops the due members in batches
+instead of keeping one Celery ETA message per booking in worker memory.
+"""
+
+from apps.common.redis_client import get_redis
+
+
+EXPIRY_KEY = "booking_expiry"
+
+POP_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+return due
+"""
+
+
+def schedule_expiry(booking):
+    get_redis().zadd(EXPIRY_KEY, {booking.id: booking.expires_at.timestamp()})
+
+
+def pop_due_bookings(now, limit):
+    """Atomically removes and returns up to ``limit`` booking ids due by ``now``."""
+    due = get_redis().eval(POP_DUE_SCRIPT, 1, EXPIRY_KEY, now.timestamp(), limit)
+    return [int(booking_id) for booking_id in due]
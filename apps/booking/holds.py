@@ -0,0 +1,99 @@
+"""
+Seat holds for pending bookings.
+
+Holds live in Redis, keyed per session: a sorted set of seat ids scored by
+the hold expiry (ms) and a hash of seat id -> owning booking. Expired holds
+are ignored on read and purged on the next write, and both keys carry a
+native TTL so an idle session cleans itself up. Nothing is written to
+Postgres until the booking is paid.
+"""
+
+from apps.common.redis_client import get_redis
+
+
+ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local expires = now + tonumber(ARGV[1])
+
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now)
+for _, seat in ipairs(expired) do
+    redis.call('ZREM', KEYS[1], seat)
+    redis.call('HDEL', KEYS[2], seat)
+end
+
+local taken = {}
+for i = 3, #ARGV do
+    local owner = redis.call('HGET', KEYS[2], ARGV[i])
+    if owner and owner ~= ARGV[2] then
+        table.insert(taken, ARGV[i])
+    end
+end
+if #taken > 0 then
+    return taken
+end
+
+for i = 3, #ARGV do
+    redis.call('ZADD', KEYS[1], expires, ARGV[i])
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[2])
+end
+
+local latest = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+redis.call('PEXPIREAT', KEYS[1], latest[2])
+redis.call('PEXPIREAT', KEYS[2], latest[2])
+return taken
+"""
+
+RELEASE_SCRIPT = """
+local released = {}
+for i = 2, #ARGV do
+    if redis.call('HGET', KEYS[2], ARGV[i]) == ARGV[1] then
+        redis.call('ZREM', KEYS[1], ARGV[i])
+        redis.call('HDEL', KEYS[2], ARGV[i])
+        table.insert(released, ARGV[i])
+    end
+end
+return released
+"""
+
+HELD_SCRIPT = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+return redis.call('ZRANGEBYSCORE', KEYS[1], '(' .. now, '+inf')
+"""
+
+
+def _keys(session_key):
+    return [f"seat_holds:{session_key}", f"seat_hold_owners:{session_key}"]
+
+
+def acquire_holds(session_key, seat_ids, owner, ttl_ms):
+    """
+    Atomically holds all seats for ``owner`` or none of them.
+    Returns the ids of seats already held by someone else.
+    """
+    if not seat_ids:
+        return []
+    taken = get_redis().eval(
+        ACQUIRE_SCRIPT, 2, *_keys(session_key), ttl_ms, owner, *seat_ids
+    )
+    return [int(seat_id) for seat_id in taken]
+
+
+def release_holds(session_key, seat_ids, owner):
+    """
+    Drops the holds on ``seat_ids`` that still belong to ``owner``.
+    Returns the ids of the seats that were actually released.
+    """
+    if not seat_ids:
+        return []
+    released = get_redis().eval(
+        RELEASE_SCRIPT, 2, *_keys(session_key), owner, *seat_ids
+    )
+    return [int(seat_id) for seat_id in released]
+
+
+def held_seat_ids(session_key):
+    """Returns the ids of seats with a live hold in the session."""
+    held = get_redis().eval(HELD_SCRIPT, 1, _keys(session_key)[0])
+    return {int(seat_id) for seat_id in held}
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_seat_claims(apps, schema_editor):
+    Booking = apps.get_model("booking", "Booking")
+    SeatClaim = apps.get_model("booking", "SeatClaim")
+
+    # места ожидающих оплаты броней держатся в Redis, в SeatClaim — только проданные
+    active_bookings = Booking.objects.filter(status="confirmed").prefetch_related(
+        "seats"
+    )
+    claims = [
+        SeatClaim(session_id=booking.session_id, seat=seat, booking=booking)
+        for booking in active_bookings
+        for seat in booking.seats.all()
+    ]
+    SeatClaim.objects.bulk_create(claims, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("booking", "0005_booking_task_id"),
+        ("schedule", "0004_rename_hall_id_session_hall_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatClaim",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "booking",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="claims",
+                        to="booking.booking",
+                        verbose_name="Бронирование",
+                    ),
+                ),
+                (
+                    "seat",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="claims",
+                        to="schedule.seat",
+                        verbose_name="Место",
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seat_claims",
+                        to="schedule.session",
+                        verbose_name="Сеанс",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Занятое место",
+                "verbose_name_plural": "Занятые места",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("session", "seat"), name="unique_session_seat_claim"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_seat_claims, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("booking", "0006_seatclaim"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="booking",
+            name="task_id",
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("booking", "0007_remove_booking_task_id"),
+        ("schedule", "0004_rename_hall_id_session_hall_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("taken", models.JSONField(default=list, verbose_name="Занятые места")),
+                (
+                    "released",
+                    models.JSONField(default=list, verbose_name="Освобождённые места"),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Попытки отправки"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seat_events",
+                        to="schedule.session",
+                        verbose_name="Сеанс",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Событие по местам",
+                "verbose_name_plural": "События по местам",
+                "ordering": ["id"],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("booking", "0008_seatevent"),
+        ("schedule", "0004_rename_hall_id_session_hall_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="booking_user_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("booking", "0009_booking_booking_user_created_idx"),
+        ("schedule", "0005_session_session_start_time_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["session", "status"], name="booking_session_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["expires_at"],
+                name="booking_pending_expiry_idx",
+            ),
+        ),
+    ]
@@ -1,8 +1,12 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction, IntegrityError
 from django.utils import timezone
 from datetime import timedelta
+from functools import partial
 from rest_framework.exceptions import ValidationError
 
+from apps.booking.holds import acquire_holds, held_seat_ids, release_holds
+from apps.booking.seatmap import mark_taken, mark_free
 from apps.common.abstract import AbstractModel
 from apps.users.models import User
 from apps.schedule.models import Session, Seat
@@ -21,6 +25,26 @@ class PaymentStatus(models.TextChoices):
     FAILED = "failed", "Ошибка оплаты"
 
 
+ACTIVE_BOOKING_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+RELEASED_BOOKING_STATUSES = (BookingStatus.CANCELLED, BookingStatus.EXPIRED)
+
+
+def free_seat_ids(session, seat_ids):
+    """
+    Returns the ``seat_ids`` that no live hold and no SeatClaim keeps taken.
+    Released seats are computed this way rather than from release_holds,
+    whose result misses holds that have already lapsed in Redis.
+    """
+    if not seat_ids:
+        return []
+    taken = held_seat_ids(session.public_id) | set(
+        SeatClaim.objects.filter(session=session, seat_id__in=seat_ids).values_list(
+            "seat_id", flat=True
+        )
+    )
+    return [seat_id for seat_id in dict.fromkeys(seat_ids) if seat_id not in taken]
+
+
 class Booking(AbstractModel):
     user = models.ForeignKey(
         User,
@@ -48,14 +72,25 @@ class Booking(AbstractModel):
     expires_at = models.DateTimeField(
         null=True, blank=True, verbose_name="Время истечения брони"
     )
-    task_id = models.CharField(
-        max_length=255, null=True, blank=True, verbose_name="ID задачи Celery"
-    )
 
     class Meta:
         verbose_name = "Бронирование"
         verbose_name_plural = "Бронирования"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="booking_user_created_idx"
+            ),
+            models.Index(
+                fields=["session", "status"], name="booking_session_status_idx"
+            ),
+            # только ожидающие оплаты брони — их и проверяет истечение
+            models.Index(
+                fields=["expires_at"],
+                name="booking_pending_expiry_idx",
+                condition=models.Q(status=BookingStatus.PENDING),
+            ),
+        ]
 
     def clean(self):
         invalid_seats = self.seats.exclude(hall=self.session.hall)
@@ -64,7 +99,9 @@ class Booking(AbstractModel):
 
     def save(self, *args, **kwargs):
         if not self.expires_at:
-            self.expires_at = timezone.now() + timedelta(minutes=15)
+            self.expires_at = timezone.now() + timedelta(
+                minutes=settings.BOOKING_HOLD_MINUTES
+            )
 
         seat_count = self.seats.count() if self.pk else 0
         if seat_count > 0:
@@ -77,6 +114,105 @@ class Booking(AbstractModel):
 
         super().save(*args, **kwargs)
 
+        if self.status in RELEASED_BOOKING_STATUSES:
+            self.release_seats()
+
+    def hold_seats(self, seats):
+        """
+        Holds seats in Redis until the booking expires.
+        Seats that are already held or sold make the whole request fail.
+        """
+        seat_ids = [seat.id for seat in seats]
+        ttl_ms = int((self.expires_at - timezone.now()).total_seconds() * 1000)
+        held = acquire_holds(
+            self.session.public_id, seat_ids, str(self.public_id), ttl_ms
+        )
+        sold = []
+        if not held:
+            sold = list(
+                SeatClaim.objects.filter(
+                    session_id=self.session_id, seat_id__in=seat_ids
+                ).values_list("seat_id", flat=True)
+            )
+            if sold:
+                release_holds(self.session.public_id, seat_ids, str(self.public_id))
+
+        if held or sold:
+            taken_ids = set(held) | set(sold)
+            taken = [
+                {"row_number": seat.row_number, "seat_number": seat.seat_number}
+                for seat in seats
+                if seat.id in taken_ids
+            ]
+            raise ValidationError(
+                {"error": "Некоторые места уже заняты", "taken": taken}
+            )
+
+        self.seats.add(*seats)
+        SeatEvent.record(self.session, taken=seat_ids)
+        transaction.on_commit(lambda: mark_taken(self.session, seat_ids), robust=True)
+
+    def drop_holds(self, seats):
+        """
+        Compensates hold_seats when the booking transaction is rolled back:
+        Redis is not part of the transaction, so the holds would otherwise
+        outlive the booking until their TTL.
+        """
+        release_holds(
+            self.session.public_id, [seat.id for seat in seats], str(self.public_id)
+        )
+
+    def claim_seats(self, seats):
+        """
+        Writes the held seats through to Postgres in a single INSERT.
+        The unique (session, seat) constraint makes the claim all-or-nothing.
+        Seats the booking has already claimed are skipped.
+        """
+        owned = set(self.claims.values_list("seat_id", flat=True))
+        claims = [
+            SeatClaim(session_id=self.session_id, seat=seat, booking=self)
+            for seat in seats
+            if seat.id not in owned
+        ]
+        try:
+            with transaction.atomic():
+                SeatClaim.objects.bulk_create(claims)
+        except IntegrityError:
+            taken = [
+                {"row_number": row_number, "seat_number": seat_number}
+                for row_number, seat_number in SeatClaim.objects.filter(
+                    session_id=self.session_id, seat__in=seats
+                ).values_list("seat__row_number", "seat__seat_number")
+            ]
+            raise ValidationError(
+                {"error": "Некоторые места уже заняты", "taken": taken}
+            )
+
+    def confirm(self):
+        """Writes the held seats through to Postgres and marks the booking paid."""
+        seats = list(self.seats.all())
+        seat_ids = [seat.id for seat in seats]
+        with transaction.atomic():
+            self.claim_seats(seats)
+            self.status = BookingStatus.CONFIRMED
+            self.save(update_fields=["status"])
+            SeatEvent.record(self.session, taken=seat_ids)
+            # холды снимаем только когда SeatClaim уже видны другим транзакциям
+            transaction.on_commit(
+                lambda: release_holds(
+                    self.session.public_id, seat_ids, str(self.public_id)
+                ),
+                robust=True,
+            )
+
+    def release_seats(self):
+        seat_ids = list(self.seats.values_list("id", flat=True))
+        release_holds(self.session.public_id, seat_ids, str(self.public_id))
+        self.claims.all().delete()
+        released = free_seat_ids(self.session, seat_ids)
+        SeatEvent.record(self.session, released=released)
+        transaction.on_commit(partial(mark_free, self.session, released), robust=True)
+
     def __str__(self):
         seats_list = ", ".join(
             [f"ряд {s.row_number}, место {s.seat_number}" for s in self.seats.all()]
@@ -84,6 +220,72 @@ class Booking(AbstractModel):
         return f"{self.user} | {self.session} | {seats_list or '—'}"
 
 
+class SeatClaim(models.Model):
+    session = models.ForeignKey(
+        Session,
+        on_delete=models.CASCADE,
+        related_name="seat_claims",
+        verbose_name="Сеанс",
+    )
+    seat = models.ForeignKey(
+        Seat, on_delete=models.CASCADE, related_name="claims", verbose_name="Место"
+    )
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name="claims",
+        verbose_name="Бронирование",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Занятое место"
+        verbose_name_plural = "Занятые места"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["session", "seat"],
+                name="unique_session_seat_claim",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.session} | ряд {self.seat.row_number}, место {self.seat.seat_number}"
+
+
+class SeatEvent(models.Model):
+    """
+    Outbox row for a seat change. Written in the same transaction as the
+    booking change and published to the channel layer by relay_seat_events
+    after commit, so rolled-back bookings never reach clients.
+    """
+
+    session = models.ForeignKey(
+        Session,
+        on_delete=models.CASCADE,
+        related_name="seat_events",
+        verbose_name="Сеанс",
+    )
+    taken = models.JSONField(default=list, verbose_name="Занятые места")
+    released = models.JSONField(default=list, verbose_name="Освобождённые места")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Попытки отправки")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Событие по местам"
+        verbose_name_plural = "События по местам"
+        ordering = ["id"]
+
+    @classmethod
+    def record(cls, session, taken=(), released=()):
+        if not taken and not released:
+            return
+        cls.objects.create(session=session, taken=list(taken), released=list(released))
+
+        from .tasks import relay_seat_events
+
+        transaction.on_commit(relay_seat_events.delay, robust=True)
+
+
 class Payment(AbstractModel):
     booking = models.OneToOneField(
         Booking,
@@ -120,8 +322,7 @@ class Payment(AbstractModel):
         self.paid_at = timezone.now()
         self.save(update_fields=["status", "paid_at"])
 
-        self.booking.status = BookingStatus.CONFIRMED
-        self.booking.save(update_fields=["status"])
+        self.booking.confirm()
 
     def mark_as_failed(self):
         self.status = PaymentStatus.FAILED
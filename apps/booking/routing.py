@@ -1,6 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from . import consumer
 
 websocket_urlpatterns = [
     path("ws/session/<uuid:session_id>/seats/", consumer.SeatConsumer.as_asgi()),
 ]
+
+channel_routes = {
+    settings.SEAT_BROADCAST_CHANNEL: consumer.SeatBroadcastConsumer.as_asgi(),
+}
@@ -0,0 +1,123 @@
+"""
+Per-session occupancy bitmap.
+
+Bit ``i`` is set when the i-th seat of the hall (see ``hall_seat_index``) is
+held or sold. The bitmap is updated in place on hold, release and expiry and
+rebuilt from SeatClaim and the Redis holds when missing or stale. Every
+update also bumps a change counter, and a rebuild is only stored if the
+counter did not move while it was reading, so an update that lands
+mid-rebuild is never overwritten by the older snapshot.
+"""
+
+from apps.booking.holds import held_seat_ids
+from apps.common.redis_client import get_redis
+from apps.schedule.layout import hall_seat_index
+
+
+SEAT_BITMAP_TTL = 10 * 60
+
+SETBITS_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 3, #ARGV do
+    redis.call('SETBIT', KEYS[1], ARGV[i], ARGV[1])
+end
+return 1
+"""
+
+STORE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[2] then
+    return 0
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3], 'NX') then
+    return 1
+end
+return 0
+"""
+
+
+def _bitmap_key(session, index):
+    return f"seat_bitmap:{session.public_id}:{index['version']}"
+
+
+def _changes_key(session, index):
+    return f"seat_bitmap_changes:{session.public_id}:{index['version']}"
+
+
+def _bit_positions(index, seat_ids):
+    seat_ids = set(seat_ids)
+    return [
+        position
+        for position, (seat_id, _, _) in enumerate(index["seats"])
+        if seat_id in seat_ids
+    ]
+
+
+def _set_bits(session, seat_ids, value):
+    if not seat_ids:
+        return
+    index = hall_seat_index(session.hall)
+    positions = _bit_positions(index, seat_ids)
+    if positions:
+        get_redis().eval(
+            SETBITS_SCRIPT,
+            2,
+            _bitmap_key(session, index),
+            _changes_key(session, index),
+            value,
+            SEAT_BITMAP_TTL,
+            *positions,
+        )
+
+
+def mark_taken(session, seat_ids):
+    _set_bits(session, seat_ids, 1)
+
+
+def mark_free(session, seat_ids):
+    _set_bits(session, seat_ids, 0)
+
+
+def _build_bitmap(session, index):
+    from apps.booking.models import SeatClaim
+
+    taken = set(
+        SeatClaim.objects.filter(session=session).values_list("seat_id", flat=True)
+    )
+    taken |= held_seat_ids(session.public_id)
+
+    bitmap = bytearray((len(index["seats"]) + 7) // 8)
+    for position in _bit_positions(index, taken):
+        bitmap[position >> 3] |= 0x80 >> (position & 7)
+    return bytes(bitmap)
+
+
+def session_bitmap(session):
+    """
+    Returns ``(index, bitmap)`` for the session.
+    The bitmap is ceil(hall size / 8) bytes, most significant bit first.
+    """
+    index = hall_seat_index(session.hall)
+    key = _bitmap_key(session, index)
+    size = (len(index["seats"]) + 7) // 8
+
+    bitmap = get_redis().get(key)
+    if bitmap is None:
+        changes_key = _changes_key(session, index)
+        changes = int(get_redis().get(changes_key) or 0)
+        bitmap = _build_bitmap(session, index)
+        get_redis().eval(
+            STORE_SCRIPT, 2, key, changes_key, bitmap, changes, SEAT_BITMAP_TTL
+        )
+    return index, bitmap.ljust(size, b"\x00")
+
+
+def taken_seats_from_bitmap(index, bitmap):
+    return [
+        {"row_number": row_number, "seat_number": seat_number}
+        for position, (_, row_number, seat_number) in enumerate(index["seats"])
+        if bitmap[position >> 3] & (0x80 >> (position & 7))
+    ]
@@ -1,6 +1,8 @@
+from django.db import transaction
+from django.db.models import Q
 from rest_framework import serializers
 
-from apps.booking.models import Booking, Payment, BookingStatus, PaymentStatus
+from apps.booking.models import Booking, Payment, PaymentStatus
 from apps.schedule.models import Seat, Session
 
 
@@ -15,47 +17,43 @@ class BookingCreateSerializer(serializers.Serializer):
 
     def validate(self, attrs):
         from apps.schedule.models import Seat
-        from apps.booking.models import Booking
 
         try:
-            session = Session.objects.get(public_id=attrs["session"])
+            session = Session.objects.select_related("hall").get(
+                public_id=attrs["session"]
+            )
         except Session.DoesNotExist:
             raise serializers.ValidationError("Сеанс не найден.")
 
         seat_coords = attrs["seats"]
-        hall = session.hall
-
-        seats = []
-        for coord in seat_coords:
-            try:
-                seat = Seat.objects.get(
-                    hall=hall,
-                    row_number=coord["row_number"],
-                    seat_number=coord["seat_number"],
-                )
-                seats.append(seat)
-            except Seat.DoesNotExist:
-                raise serializers.ValidationError(
-                    f"Место ряд={coord['row_number']}, место={coord['seat_number']} не существует в этом зале."
-                )
-
-        already_booked = Booking.objects.filter(
-            session=session,
-            seats__in=seats,
-            status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
-        ).distinct()
-
-        if already_booked.exists():
-            taken = []
-            for b in already_booked:
-                for s in b.seats.all():
-                    taken.append(
-                        {"row_number": s.row_number, "seat_number": s.seat_number}
-                    )
+
+        # Resolve all coordinates in one query against unique_hall_row_seat.
+        requested = list(
+            dict.fromkeys((c["row_number"], c["seat_number"]) for c in seat_coords)
+        )
+        seat_filter = Q()
+        for row_number, seat_number in requested:
+            seat_filter |= Q(row_number=row_number, seat_number=seat_number)
+
+        seats_by_coord = {}
+        if requested:
+            seats_by_coord = {
+                (seat.row_number, seat.seat_number): seat
+                for seat in Seat.objects.filter(seat_filter, hall_id=session.hall_id)
+            }
+
+        missing = [coord for coord in requested if coord not in seats_by_coord]
+        if missing:
+            missing_str = "; ".join(
+                f"ряд={row_number}, место={seat_number}"
+                for row_number, seat_number in missing
+            )
             raise serializers.ValidationError(
-                {"error": "Некоторые места уже заняты", "taken": taken}
+                f"Места не существуют в этом зале: {missing_str}."
             )
 
+        seats = [seats_by_coord[coord] for coord in requested]
+
         attrs["session_obj"] = session
         attrs["seats_obj"] = seats
         return attrs
@@ -65,12 +63,20 @@ class BookingCreateSerializer(serializers.Serializer):
         session = validated_data["session_obj"]
         seats = validated_data["seats_obj"]
 
-        booking = Booking.objects.create(
-            user=user,
-            session=session,
-        )
-        booking.seats.add(*seats)
-        booking.save()
+        booking = Booking(user=user, session=session)
+        committed = []
+        try:
+            with transaction.atomic():
+                # регистрируется первым, поэтому выполнится раньше прочих колбэков
+                transaction.on_commit(lambda: committed.append(True))
+                booking.save()
+                booking.hold_seats(seats)
+                booking.save()
+        except Exception:
+            # ошибка после коммита не отменяет бронь — холды ей ещё нужны
+            if not committed:
+                booking.drop_holds(seats)
+            raise
         return booking
 
 
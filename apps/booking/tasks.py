@@ -1,66 +1,200 @@
+import uuid
+from collections import defaultdict
+from functools import partial
+
 from celery import shared_task
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
 from django.utils import timezone
-from .models import Booking, BookingStatus
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from .events import publish_seat_delta
+from .expiry import pop_due_bookings
+from .holds import release_holds
+from .models import Booking, BookingStatus, SeatClaim, SeatEvent, free_seat_ids
+from .seatmap import mark_free
+from apps.schedule.grid import invalidate_schedule_grid
+from apps.schedule.models import Session
 import logging
 
 
 logger = logging.getLogger(__name__)
 
 
+def expire_bookings(booking_ids=None):
+    """
+    Expires due pending bookings in one conditional UPDATE ... RETURNING,
+    optionally limited to ``booking_ids``, then frees their seats and records
+    one seat event per affected session. Returns the number expired.
+    """
+    if booking_ids is not None and not booking_ids:
+        return 0
+
+    now = timezone.now()
+    table = Booking._meta.db_table
+    sql = (
+        f"UPDATE {table} SET status = %s, updated_at = %s "
+        f"WHERE status = %s AND expires_at < %s"
+    )
+    params = [BookingStatus.EXPIRED.value, now, BookingStatus.PENDING.value, now]
+    if booking_ids is not None:
+        sql += f" AND id IN ({', '.join(['%s'] * len(booking_ids))})"
+        params += list(booking_ids)
+    sql += " RETURNING id, public_id, session_id"
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            expired = cursor.fetchall()
+        if not expired:
+            return 0
+        SeatClaim.objects.filter(booking_id__in=[row[0] for row in expired]).delete()
+
+        seats_by_booking = defaultdict(list)
+        for booking_id, seat_id in Booking.seats.through.objects.filter(
+            booking_id__in=[row[0] for row in expired]
+        ).values_list("booking_id", "seat_id"):
+            seats_by_booking[booking_id].append(seat_id)
+
+        bookings_by_session = defaultdict(list)
+        for booking_id, public_id, session_id in expired:
+            bookings_by_session[session_id].append((booking_id, public_id))
+
+        sessions = Session.objects.filter(id__in=bookings_by_session).select_related(
+            "hall"
+        )
+        for session in sessions:
+            seat_ids = []
+            for booking_id, public_id in bookings_by_session[session.id]:
+                release_holds(
+                    session.public_id,
+                    seats_by_booking[booking_id],
+                    str(uuid.UUID(str(public_id))),
+                )
+                seat_ids += seats_by_booking[booking_id]
+            # холд к этому моменту обычно уже истёк в Redis
+            released = free_seat_ids(session, seat_ids)
+            SeatEvent.record(session, released=released)
+            transaction.on_commit(partial(mark_free, session, released))
+
+    return len(expired)
+
+
 @shared_task
 def check_booking_expiration(booking_id: int):
     """
     Checks if a booking has expired and updates its status.
     If the booking has expired, it also sends a WebSocket message to notify clients.
     """
-    try:
-        booking = Booking.objects.get(id=booking_id)
-    except Booking.DoesNotExist:
-        logger.warning(f"Booking with id {booking_id} not found.")
-        return
-
-    if booking.status == BookingStatus.PENDING and booking.expires_at < timezone.now():
-        booking.status = BookingStatus.EXPIRED
-        booking.save()
-
-        # Notify clients via WebSocket
-        channel_layer = get_channel_layer()
-        session_id = booking.session.id
-        taken_seats = list(
-            Booking.objects.filter(
-                session_id=session_id,
-                status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
-            )
-            .values_list("seats__id", flat=True)
-            .distinct()
-        )
-
-        async_to_sync(channel_layer.group_send)(
-            f"seat_updates_{session_id}",
-            {
-                "type": "seat_update",
-                "taken_seats": taken_seats,
-            },
-        )
+    if expire_bookings([booking_id]):
         logger.info(
             f"Booking {booking_id} expired and status updated. WebSocket message sent."
         )
 
 
+@shared_task
+def sweep_expired_bookings():
+    """
+    Expires the bookings that came due in the expiry schedule, in batches.
+    Bookings that were paid or cancelled in the meantime are skipped.
+    """
+    expired = 0
+    while True:
+        booking_ids = pop_due_bookings(
+            timezone.now(), settings.BOOKING_EXPIRY_SWEEP_BATCH
+        )
+        if not booking_ids:
+            break
+        expired += expire_bookings(booking_ids)
+
+    if expired:
+        logger.info(f"Expiry sweep expired {expired} bookings.")
+
+
 @shared_task
 def check_all_expired_bookings():
     """
-    Periodically checks all pending bookings and marks them as expired if needed.
+    Periodically marks all stale pending bookings as expired in bulk.
     """
-    expired_bookings = Booking.objects.filter(
-        status=BookingStatus.PENDING, expires_at__lt=timezone.now()
-    )
-    count = expired_bookings.count()
+    count = expire_bookings()
     if count > 0:
-        for booking in expired_bookings:
-            check_booking_expiration.delay(booking.id)
-        logger.info(f"Found and triggered expiration check for {count} bookings.")
+        logger.info(f"Expired {count} stale bookings.")
     else:
         logger.info("No expired bookings found.")
+
+
+# первый ключ двухключевой advisory-блокировки: отделяет её от других
+SEAT_RELAY_LOCK = 4201
+
+
+def _lock_session_events(session_id):
+    """
+    Takes the transaction-level advisory lock that makes one relay the only
+    writer for the session; returns False if another relay holds it.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_try_advisory_xact_lock(%s, %s)", [SEAT_RELAY_LOCK, session_id]
+        )
+        return cursor.fetchone()[0]
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=1)
+def relay_seat_events(self):
+    """
+    Publishes committed seat events from the outbox, one session at a time.
+    A session's events are published only by the relay holding its advisory
+    lock, oldest first and merged into a single delta, so versions are
+    assigned in event order even with several relays running. Sessions
+    locked by another relay are left to it. On a channel layer error the
+    unsent events stay in the outbox and the task retries.
+    """
+    busy = set()
+    while True:
+        session_ids = list(
+            SeatEvent.objects.exclude(session_id__in=busy)
+            .order_by("session_id")
+            .values_list("session_id", flat=True)
+            .distinct()[: settings.SEAT_EVENT_RELAY_BATCH]
+        )
+        if not session_ids:
+            return
+
+        for session_id in session_ids:
+            failure = None
+            with transaction.atomic():
+                if not _lock_session_events(session_id):
+                    busy.add(session_id)
+                    continue
+
+                events = list(
+                    SeatEvent.objects.filter(session_id=session_id)
+                    .select_related("session__hall")
+                    .order_by("id")[: settings.SEAT_EVENT_RELAY_BATCH]
+                )
+                if not events:
+                    continue
+
+                seats = {}
+                for event in events:
+                    seats.update({seat_id: True for seat_id in event.taken})
+                    seats.update({seat_id: False for seat_id in event.released})
+
+                event_ids = [event.id for event in events]
+                try:
+                    publish_seat_delta(
+                        events[0].session,
+                        taken=[seat for seat, taken in seats.items() if taken],
+                        released=[seat for seat, taken in seats.items() if not taken],
+                    )
+                except Exception as exc:
+                    SeatEvent.objects.filter(id__in=event_ids).update(
+                        attempts=F("attempts") + 1
+                    )
+                    failure = exc
+                else:
+                    SeatEvent.objects.filter(id__in=event_ids).delete()
+                    invalidate_schedule_grid(events[0].session)
+
+            if failure is not None:
+                logger.warning(f"Seat event relay failed: {failure}")
+                raise self.retry(exc=failure)
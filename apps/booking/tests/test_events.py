@@ -0,0 +1,65 @@
+import pytest
+
+from apps.booking.events import contiguous_runs, merge_seat_deltas
+
+
+def make_delta(version, taken=(), released=()):
+    return {
+        "type": "seat.delta",
+        "session_id": "session-1",
+        "version": version,
+        "taken": [{"row_number": r, "seat_number": s} for r, s in taken],
+        "released": [{"row_number": r, "seat_number": s} for r, s in released],
+    }
+
+
+class TestMergeSeatDeltas:
+    def test_merges_window_into_one_update(self):
+        message = merge_seat_deltas(
+            [
+                make_delta(6, taken=[(2, 1)]),
+                make_delta(4, taken=[(1, 1), (1, 2)]),
+                make_delta(5, released=[(1, 2)], taken=[(3, 3)]),
+            ]
+        )
+
+        assert message["type"] == "seat_update"
+        assert message["session_id"] == "session-1"
+        assert message["base_version"] == 3
+        assert message["version"] == 6
+        assert message["taken"] == [
+            {"row_number": 1, "seat_number": 1},
+            {"row_number": 2, "seat_number": 1},
+            {"row_number": 3, "seat_number": 3},
+        ]
+        assert message["released"] == [{"row_number": 1, "seat_number": 2}]
+
+    def test_last_change_to_a_seat_wins(self):
+        message = merge_seat_deltas(
+            [
+                make_delta(1, taken=[(1, 1)]),
+                make_delta(2, released=[(1, 1)]),
+                make_delta(3, taken=[(1, 1)]),
+            ]
+        )
+
+        assert message["taken"] == [{"row_number": 1, "seat_number": 1}]
+        assert message["released"] == []
+
+    def test_rejects_version_gaps(self):
+        with pytest.raises(ValueError):
+            merge_seat_deltas([make_delta(3, taken=[(1, 1)]), make_delta(5)])
+
+
+class TestContiguousRuns:
+    def test_splits_at_version_gaps(self):
+        runs = contiguous_runs(
+            [make_delta(7), make_delta(3), make_delta(4), make_delta(9)]
+        )
+
+        assert [[delta["version"] for delta in run] for run in runs] == [
+            [3, 4],
+            [7],
+            [9],
+        ]
+        assert [merge_seat_deltas(run)["base_version"] for run in runs] == [2, 6, 8]
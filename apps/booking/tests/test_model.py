@@ -1,9 +1,20 @@
 import pytest
+from unittest.mock import patch
 from datetime import timedelta
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
+from apps.booking.holds import held_seat_ids
 from apps.schedule.models import Hall, Session, Seat
-from apps.booking.models import Booking, Payment, BookingStatus, PaymentStatus
+from apps.booking.models import (
+    Booking,
+    Payment,
+    SeatClaim,
+    SeatEvent,
+    BookingStatus,
+    PaymentStatus,
+)
+from apps.common.tests.utils import explain
 from apps.users.models import User
 
 
@@ -82,3 +93,109 @@ class TestBookingModels:
         with pytest.raises(ValidationError) as excinfo:
             Payment(booking=booking, amount=booking.total_amount).clean()
         assert "Нельзя оплатить отменённую или истекшую бронь" in str(excinfo.value)
+
+    def test_confirm_with_backfilled_claims(
+        self, user: User, session: Session, seats: list[Seat]
+    ):
+        booking = Booking.objects.create(user=user, session=session)
+        booking.hold_seats(seats)
+        # ожидающая бронь, для которой старая миграция уже создала SeatClaim
+        SeatClaim.objects.create(session=session, seat=seats[0], booking=booking)
+
+        booking.confirm()
+
+        assert booking.status == BookingStatus.CONFIRMED
+        assert SeatClaim.objects.filter(booking=booking).count() == len(seats)
+
+    def test_claim_seats_is_exclusive_per_session(
+        self, user: User, session: Session, seats: list[Seat]
+    ):
+        first = Booking.objects.create(user=user, session=session)
+        first.claim_seats(seats)
+
+        second = Booking.objects.create(user=user, session=session)
+        with pytest.raises(ValidationError) as excinfo:
+            second.claim_seats([seats[1]])
+        assert "Некоторые места уже заняты" in str(excinfo.value)
+        assert SeatClaim.objects.filter(session=session).count() == 2
+        assert second.seats.count() == 0
+
+    def test_cancelled_booking_releases_claims(
+        self, user: User, session: Session, seats: list[Seat]
+    ):
+        booking = Booking.objects.create(user=user, session=session)
+        booking.hold_seats(seats)
+        booking.confirm()
+
+        booking.status = BookingStatus.CANCELLED
+        booking.save(update_fields=["status"])
+
+        assert not SeatClaim.objects.filter(session=session).exists()
+        assert booking.seats.count() == len(seats)
+
+    def test_cancel_after_hold_lapsed_releases_seats(
+        self, user: User, session: Session, seats: list[Seat]
+    ):
+        booking = Booking(
+            user=user,
+            session=session,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        booking.save()
+        booking.hold_seats(seats)
+        SeatEvent.objects.all().delete()
+
+        booking.status = BookingStatus.CANCELLED
+        booking.save(update_fields=["status"])
+
+        event = SeatEvent.objects.get(session=session)
+        assert sorted(event.released) == sorted(seat.id for seat in seats)
+
+    def test_hold_seats_rejects_seats_held_by_another_booking(
+        self, user: User, session: Session, seats: list[Seat]
+    ):
+        first = Booking.objects.create(user=user, session=session)
+        first.hold_seats(seats)
+
+        second = Booking.objects.create(user=user, session=session)
+        with pytest.raises(ValidationError) as excinfo:
+            second.hold_seats([seats[1]])
+        assert "Некоторые места уже заняты" in str(excinfo.value)
+        assert held_seat_ids(session.public_id) == {seat.id for seat in seats}
+
+    def test_confirm_writes_holds_through_to_claims(
+        self,
+        user: User,
+        session: Session,
+        seats: list[Seat],
+        django_capture_on_commit_callbacks,
+    ):
+        booking = Booking.objects.create(user=user, session=session)
+        booking.hold_seats(seats)
+
+        with patch("apps.booking.tasks.relay_seat_events.delay"):
+            with django_capture_on_commit_callbacks(execute=True):
+                booking.confirm()
+                # до коммита места остаются под холдом
+                assert held_seat_ids(session.public_id) == {seat.id for seat in seats}
+
+        assert booking.status == BookingStatus.CONFIRMED
+        assert SeatClaim.objects.filter(booking=booking).count() == len(seats)
+        assert held_seat_ids(session.public_id) == set()
+
+
+@pytest.mark.django_db
+class TestBookingIndexes:
+    def test_session_status_lookup_uses_index(self, session: Session):
+        plan = explain(
+            Booking.objects.filter(session=session, status=BookingStatus.CONFIRMED)
+        )
+        assert "booking_session_status_idx" in plan
+
+    def test_pending_expiry_lookup_uses_partial_index(self):
+        plan = explain(
+            Booking.objects.filter(
+                status=BookingStatus.PENDING, expires_at__lt=timezone.now()
+            )
+        )
+        assert "booking_pending_expiry_idx" in plan
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+import pytest
+
+from apps.booking import seatmap
+from apps.booking.seatmap import mark_free, mark_taken, session_bitmap
+from apps.schedule.models import Hall, Seat, Session
+
+
+@pytest.fixture
+def seats(db, hall: Hall) -> list[Seat]:
+    return [
+        Seat.objects.create(hall=hall, row_number=1, seat_number=i + 1)
+        for i in range(4)
+    ]
+
+
+@pytest.mark.django_db
+class TestSessionBitmap:
+    def test_updates_applied_in_place(self, session: Session, seats: list[Seat]):
+        session_bitmap(session)
+
+        mark_taken(session, [seats[0].id, seats[2].id])
+        assert session_bitmap(session)[1] == bytes([0b10100000])
+
+        mark_free(session, [seats[0].id])
+        assert session_bitmap(session)[1] == bytes([0b00100000])
+
+    def test_rebuild_racing_with_update_is_not_stored(
+        self, session: Session, seats: list[Seat]
+    ):
+        build = seatmap._build_bitmap
+
+        def build_then_update(session, index):
+            bitmap = build(session, index)
+            # изменение между чтением БД и записью снимка в Redis
+            mark_taken(session, [seats[1].id])
+            return bitmap
+
+        with patch.object(seatmap, "_build_bitmap", side_effect=build_then_update):
+            _, stale = session_bitmap(session)
+        assert stale == bytes([0b00000000])
+
+        with patch.object(seatmap, "_build_bitmap", wraps=build) as rebuild:
+            session_bitmap(session)
+        rebuild.assert_called_once()
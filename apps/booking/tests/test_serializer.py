@@ -1,4 +1,7 @@
 import pytest
+from unittest.mock import patch
+
+from django.db import IntegrityError
 from rest_framework.exceptions import ValidationError
 from django.test import RequestFactory
 
@@ -7,6 +10,7 @@ from apps.booking.serializer import (
     BookingListSerializer,
     PaymentSerializer,
 )
+from apps.booking.holds import held_seat_ids
 from apps.booking.models import Booking, BookingStatus, PaymentStatus
 from apps.schedule.models import Seat, Hall, Session
 from apps.users.models import User
@@ -50,6 +54,26 @@ class TestBookingSerializers:
         assert booking_instance.session == session
         assert booking_instance.seats.count() == len(seats)
 
+    def test_booking_create_rollback_drops_holds(self, session, seats, user):
+        request = RequestFactory().post("/fake-url/")
+        request.user = user
+        data = {
+            "session": str(session.public_id),
+            "seats": [
+                {"row_number": seat.row_number, "seat_number": seat.seat_number}
+                for seat in seats
+            ],
+        }
+        serializer = BookingCreateSerializer(data=data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        with patch("apps.booking.models.SeatEvent.record", side_effect=IntegrityError):
+            with pytest.raises(IntegrityError):
+                serializer.save()
+
+        assert held_seat_ids(session.public_id) == set()
+        assert not Booking.objects.filter(session=session).exists()
+
     def test_booking_create_serializer_invalid_session(self, seats, user, hall):
         import uuid
 
@@ -76,7 +100,7 @@ class TestBookingSerializers:
         existing_booking = Booking.objects.create(
             user=other_user, session=session, status=BookingStatus.CONFIRMED
         )
-        existing_booking.seats.add(seats[0])
+        existing_booking.claim_seats([seats[0]])
 
         factory = RequestFactory()
         request = factory.post("/fake-url/")
@@ -89,9 +113,32 @@ class TestBookingSerializers:
             ],
         }
         serializer = BookingCreateSerializer(data=data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
         with pytest.raises(ValidationError) as excinfo:
-            serializer.is_valid(raise_exception=True)
+            serializer.save()
         assert "Некоторые места уже заняты" in str(excinfo.value)
+        assert Booking.objects.filter(session=session).count() == 1
+
+    def test_booking_create_serializer_reports_all_missing_seats(
+        self, session, seats, user
+    ):
+        factory = RequestFactory()
+        request = factory.post("/fake-url/")
+        request.user = user
+
+        data = {
+            "session": str(session.public_id),
+            "seats": [
+                {"row_number": 1, "seat_number": 1},
+                {"row_number": 5, "seat_number": 1},
+                {"row_number": 7, "seat_number": 3},
+            ],
+        }
+        serializer = BookingCreateSerializer(data=data, context={"request": request})
+        with pytest.raises(ValidationError) as excinfo:
+            serializer.is_valid(raise_exception=True)
+        assert "ряд=5, место=1" in str(excinfo.value)
+        assert "ряд=7, место=3" in str(excinfo.value)
 
     def test_booking_list_serializer(self, booking: Booking):
         serializer = BookingListSerializer(instance=booking)
@@ -0,0 +1,164 @@
+import pytest
+from datetime import timedelta
+from unittest.mock import patch, MagicMock, AsyncMock
+from django.utils import timezone
+
+from apps.booking.expiry import schedule_expiry
+from apps.booking.models import Booking, BookingStatus, SeatEvent
+from apps.booking.holds import held_seat_ids
+from apps.booking.tasks import (
+    sweep_expired_bookings,
+    check_all_expired_bookings,
+    relay_seat_events,
+)
+from apps.schedule.models import Hall, Session, Seat
+from apps.users.models import User
+
+
+@pytest.fixture
+def seats(db, hall: Hall) -> list[Seat]:
+    return [
+        Seat.objects.create(hall=hall, row_number=1, seat_number=i + 1)
+        for i in range(3)
+    ]
+
+
+def make_booking(user, session, seats, expires_at):
+    booking = Booking.objects.create(user=user, session=session)
+    booking.hold_seats(seats)
+    booking.expires_at = expires_at
+    booking.save()
+    schedule_expiry(booking)
+    return booking
+
+
+@pytest.fixture
+def channel_layer():
+    layer = MagicMock()
+    layer.send = AsyncMock()
+    with patch("apps.booking.events.get_channel_layer", return_value=layer):
+        yield layer
+
+
+@pytest.mark.django_db
+class TestSweepExpiredBookings:
+    def test_sweep_expires_only_due_pending_bookings(
+        self, channel_layer, user: User, session: Session, seats
+    ):
+        now = timezone.now()
+        due = make_booking(user, session, [seats[0]], now - timedelta(seconds=1))
+        paid = make_booking(user, session, [seats[1]], now - timedelta(seconds=1))
+        paid.confirm()
+        later = make_booking(user, session, [seats[2]], now + timedelta(minutes=5))
+
+        relay_seat_events()
+        channel_layer.send.reset_mock()
+        sweep_expired_bookings()
+        relay_seat_events()
+
+        due.refresh_from_db()
+        paid.refresh_from_db()
+        later.refresh_from_db()
+        assert due.status == BookingStatus.EXPIRED
+        assert paid.status == BookingStatus.CONFIRMED
+        assert later.status == BookingStatus.PENDING
+        channel_layer.send.assert_called_once()
+
+    def test_sweep_releases_seats_whose_hold_already_lapsed(
+        self, channel_layer, user: User, session: Session, seats
+    ):
+        booking = Booking(
+            user=user,
+            session=session,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        booking.save()
+        # TTL холда заканчивается ровно в expires_at, так что в Redis его уже нет
+        booking.hold_seats(seats[:2])
+        schedule_expiry(booking)
+        assert held_seat_ids(session.public_id) == set()
+        relay_seat_events()
+        channel_layer.send.reset_mock()
+
+        sweep_expired_bookings()
+
+        booking.refresh_from_db()
+        assert booking.status == BookingStatus.EXPIRED
+        event = SeatEvent.objects.get(session=session)
+        assert sorted(event.released) == [seats[0].id, seats[1].id]
+
+    def test_check_all_expires_in_bulk_with_one_update_per_session(
+        self, channel_layer, user: User, session: Session, seats
+    ):
+        past = timezone.now() - timedelta(minutes=1)
+        first = make_booking(user, session, [seats[0]], past)
+        second = make_booking(user, session, [seats[1], seats[2]], past)
+
+        relay_seat_events()
+        channel_layer.send.reset_mock()
+        check_all_expired_bookings()
+        relay_seat_events()
+
+        assert set(
+            Booking.objects.filter(pk__in=[first.pk, second.pk]).values_list(
+                "status", flat=True
+            )
+        ) == {BookingStatus.EXPIRED}
+        assert held_seat_ids(session.public_id) == set()
+        channel_layer.send.assert_called_once()
+        _, message = channel_layer.send.call_args.args
+        assert len(message["released"]) == 3
+        assert message["taken"] == []
+
+
+@pytest.mark.django_db
+class TestRelaySeatEvents:
+    def test_relay_merges_events_per_session_and_clears_outbox(
+        self, channel_layer, session: Session, seats
+    ):
+        SeatEvent.record(session, taken=[seats[0].id, seats[1].id])
+        SeatEvent.record(session, released=[seats[1].id])
+        relay_seat_events()
+
+        channel_layer.send.assert_called_once()
+        _, message = channel_layer.send.call_args.args
+        assert message["taken"] == [{"row_number": 1, "seat_number": 1}]
+        assert message["released"] == [{"row_number": 1, "seat_number": 2}]
+        assert not SeatEvent.objects.exists()
+
+    @patch("apps.booking.tasks.relay_seat_events.retry")
+    def test_relay_keeps_events_when_publish_fails(
+        self, mock_retry, channel_layer, session: Session, seats
+    ):
+        channel_layer.send.side_effect = ConnectionError
+        mock_retry.side_effect = RuntimeError
+
+        SeatEvent.record(session, taken=[seats[0].id])
+        with pytest.raises(RuntimeError):
+            relay_seat_events()
+
+        event = SeatEvent.objects.get(session=session)
+        assert event.attempts == 1
+
+    @patch("apps.booking.tasks._lock_session_events")
+    def test_relay_skips_sessions_locked_by_another_relay(
+        self, mock_lock, channel_layer, session: Session, seats
+    ):
+        other = Session.objects.create(
+            movie=session.movie,
+            hall=session.hall,
+            start_time=session.start_time + timedelta(hours=3),
+            price=session.price,
+        )
+        mock_lock.side_effect = lambda session_id: session_id != session.id
+
+        SeatEvent.record(session, taken=[seats[0].id])
+        SeatEvent.record(other, taken=[seats[1].id])
+        relay_seat_events()
+
+        channel_layer.send.assert_called_once()
+        _, message = channel_layer.send.call_args.args
+        assert message["session_id"] == str(other.public_id)
+        assert list(SeatEvent.objects.values_list("session_id", flat=True)) == [
+            session.id
+        ]
@@ -1,10 +1,14 @@
+import base64
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from django.urls import reverse
 from rest_framework import status
+from kombu.exceptions import OperationalError
 from rest_framework.test import APIClient
 
-from apps.booking.models import Booking, BookingStatus
+from apps.booking.holds import held_seat_ids
+from apps.booking.models import Booking, BookingStatus, SeatEvent
+from apps.booking.tasks import relay_seat_events
 from apps.users.models import User
 from apps.schedule.models import Seat, Hall, Session
 
@@ -27,7 +31,7 @@ def seats(db, hall: Hall) -> list[Seat]:
 @pytest.fixture
 def booking(db, user: User, session: Session, seats: list[Seat]) -> Booking:
     b = Booking.objects.create(user=user, session=session)
-    b.seats.add(seats[0], seats[1])
+    b.hold_seats([seats[0], seats[1]])
     b.save()
     return b
 
@@ -35,11 +39,19 @@ def booking(db, user: User, session: Session, seats: list[Seat]) -> Booking:
 @pytest.fixture
 def other_booking(db, other_user: User, session: Session, seats: list[Seat]) -> Booking:
     b = Booking.objects.create(user=other_user, session=session)
-    b.seats.add(seats[2], seats[3])
+    b.hold_seats([seats[2], seats[3]])
     b.save()
     return b
 
 
+@pytest.fixture
+def channel_layer():
+    layer = MagicMock()
+    layer.send = AsyncMock()
+    with patch("apps.booking.events.get_channel_layer", return_value=layer):
+        yield layer
+
+
 @pytest.mark.django_db
 class TestBookingViewSet:
     def setup_method(self):
@@ -59,16 +71,18 @@ class TestBookingViewSet:
         response = self.client.post(self.list_create_url, {})
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
-    @patch("apps.booking.tasks.check_booking_expiration.apply_async")
-    @patch("apps.booking.views.get_channel_layer")
+    @patch("apps.booking.views.schedule_expiry")
+    @patch("apps.booking.tasks.relay_seat_events.delay")
     def test_create_booking_success(
-        self, mock_get_channel_layer, mock_check_expiration, user, session, seats
+        self,
+        mock_relay_delay,
+        mock_schedule_expiry,
+        channel_layer,
+        user,
+        session,
+        seats,
+        django_capture_on_commit_callbacks,
     ):
-        mock_check_expiration.return_value = MagicMock(id="fake-celery-task-id")
-        channel_layer_mock = MagicMock()
-        channel_layer_mock.group_send = AsyncMock()
-        mock_get_channel_layer.return_value = channel_layer_mock
-
         self.client.force_authenticate(user=user)
         data = {
             "session": str(session.public_id),
@@ -77,21 +91,56 @@ class TestBookingViewSet:
                 for s in [seats[0], seats[1]]
             ],
         }
-        response = self.client.post(self.list_create_url, data, format="json")
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.client.post(self.list_create_url, data, format="json")
 
         assert response.status_code == status.HTTP_201_CREATED
         assert Booking.objects.filter(user=user, session=session).exists()
         new_booking = Booking.objects.get(user=user, session=session)
         assert new_booking.seats.count() == 2
-        mock_check_expiration.assert_called_once()
-        channel_layer_mock.group_send.assert_called_once()
+        mock_schedule_expiry.assert_called_once_with(new_booking)
+        channel_layer.send.assert_not_called()
+        mock_relay_delay.assert_called_once()
+
+        relay_seat_events()
+        channel_layer.send.assert_called_once()
+        channel, message = channel_layer.send.call_args.args
+        assert channel == "seat-broadcast"
+        assert message["session_id"] == str(session.public_id)
+        assert message["version"] == 1
+        assert message["taken"] == [
+            {"row_number": 1, "seat_number": 1},
+            {"row_number": 1, "seat_number": 2},
+        ]
+        assert message["released"] == []
+
+    @pytest.mark.django_db(transaction=True)
+    @patch("apps.booking.views.schedule_expiry")
+    @patch("apps.booking.tasks.relay_seat_events.apply_async")
+    def test_create_booking_survives_broker_error_after_commit(
+        self, mock_relay_apply, mock_schedule_expiry, user, session, seats
+    ):
+        mock_relay_apply.side_effect = OperationalError("broker is down")
+
+        self.client.force_authenticate(user=user)
+        data = {
+            "session": str(session.public_id),
+            "seats": [{"row_number": 1, "seat_number": 1}],
+        }
+        response = self.client.post(self.list_create_url, data, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        new_booking = Booking.objects.get(user=user, session=session)
+        mock_relay_apply.assert_called_once()
+        mock_schedule_expiry.assert_called_once_with(new_booking)
+        assert held_seat_ids(session.public_id) == {seats[0].id}
 
     def test_list_user_bookings(self, user, booking, other_booking):
         self.client.force_authenticate(user=user)
         response = self.client.get(self.list_create_url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["count"] == 1
+        assert len(response.data["results"]) == 1
         assert response.data["results"][0]["id"] == str(booking.public_id)
 
     def test_cannot_retrieve_other_user_booking(self, user, other_booking):
@@ -101,11 +150,7 @@ class TestBookingViewSet:
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
-    @patch("config.celery.app.control.revoke")
-    def test_cancel_booking_success(self, mock_celery_revoke, user, booking):
-        booking.task_id = "some-celery-task-id"
-        booking.save()
-
+    def test_cancel_booking_success(self, user, booking):
         self.client.force_authenticate(user=user)
         url = self.cancel_url(booking.public_id)
         response = self.client.post(url)
@@ -115,7 +160,6 @@ class TestBookingViewSet:
 
         booking.refresh_from_db()
         assert booking.status == BookingStatus.CANCELLED
-        mock_celery_revoke.assert_called_once_with("some-celery-task-id")
 
     def test_cancel_already_cancelled_booking_fails(self, user, booking):
         booking.status = BookingStatus.CANCELLED
@@ -129,7 +173,7 @@ class TestBookingViewSet:
 
     #
     # @patch("apps.booking.tasks.check_booking_expiration.apply_async")
-    # @patch("apps.booking.views.get_channel_layer")
+    # @patch("apps.booking.events.get_channel_layer")
     # def test_create_booking_throttling(
     #         self,
     #         mock_get_channel_layer,
@@ -210,7 +254,7 @@ class TestBookingViewSet:
     #     assert "Simulated internal server error" in mock_logger.error.call_args[0][0] # More specific log message check if needed
 
     # @patch("apps.booking.tasks.check_booking_expiration.apply_async")
-    # @patch("apps.booking.views.get_channel_layer")
+    # @patch("apps.booking.events.get_channel_layer")
     # def test_create_booking_with_invalid_data_fails(
     #         self,
     #         mock_get_channel_layer,
@@ -244,17 +288,8 @@ class TestBookingViewSet:
     def seats_url(self, session_id):
         return reverse("session-seats", kwargs={"session_id": session_id})
 
-    @patch("apps.booking.views.get_channel_layer")
-    @patch("config.celery.app.control.revoke")
-    def test_payment_success(
-        self, mock_celery_revoke, mock_get_channel_layer, user, booking
-    ):
-        channel_layer_mock = MagicMock()
-        channel_layer_mock.group_send = AsyncMock()
-        mock_get_channel_layer.return_value = channel_layer_mock
-
+    def test_payment_success(self, channel_layer, user, booking):
         booking.status = BookingStatus.PENDING
-        booking.task_id = "some-task"
         booking.save()
 
         self.client.force_authenticate(user=user)
@@ -265,8 +300,11 @@ class TestBookingViewSet:
         booking.refresh_from_db()
         assert booking.status == BookingStatus.CONFIRMED
         assert booking.payment.status == "paid"
-        mock_celery_revoke.assert_called_once_with("some-task")
-        channel_layer_mock.group_send.assert_called_once()
+        assert SeatEvent.objects.filter(session=booking.session).exists()
+
+        relay_seat_events()
+        channel_layer.send.assert_called_once()
+        assert not SeatEvent.objects.exists()
 
     def test_payment_for_other_user_booking_fails(self, user, other_booking):
         self.client.force_authenticate(user=user)
@@ -274,13 +312,76 @@ class TestBookingViewSet:
         response = self.client.post(url)
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
-    def test_get_session_seats(self, session, other_booking):
+    def test_get_session_seats(self, channel_layer, session, other_booking):
+        relay_seat_events()
+
         url = self.seats_url(session.public_id)
         response = self.client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
         assert response.data["sessionId"] == str(session.public_id)
+        assert response.data["version"] == 1
         taken = response.data["takenSeats"]
         assert len(taken) == other_booking.seats.count()
         assert {"row_number": 1, "seat_number": 3} in taken
         assert {"row_number": 1, "seat_number": 4} in taken
+
+    def test_get_session_seats_bitmap(
+        self,
+        channel_layer,
+        session,
+        seats,
+        booking,
+        other_booking,
+        django_capture_on_commit_callbacks,
+    ):
+        url = self.seats_url(session.public_id)
+        response = self.client.get(url, {"encoding": "bitmap"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["seatCount"] == len(seats)
+        assert base64.b64decode(response.data["bitmap"]) == bytes([0b11110000])
+
+        with patch("apps.booking.tasks.relay_seat_events.delay"):
+            with django_capture_on_commit_callbacks(execute=True):
+                other_booking.status = BookingStatus.CANCELLED
+                other_booking.save(update_fields=["status"])
+        relay_seat_events()
+
+        response = self.client.get(url, {"encoding": "bitmap"})
+        assert base64.b64decode(response.data["bitmap"]) == bytes([0b11000000])
+
+    def test_get_session_seats_cached_with_etag(
+        self,
+        channel_layer,
+        session,
+        booking,
+        other_booking,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        relay_seat_events()
+
+        url = self.seats_url(session.public_id)
+        response = self.client.get(url)
+        etag = response["ETag"]
+        assert len(response.data["takenSeats"]) == 4
+
+        with django_assert_num_queries(0):
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert response["ETag"] == etag
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        with patch("apps.booking.tasks.relay_seat_events.delay"):
+            with django_capture_on_commit_callbacks(execute=True):
+                other_booking.status = BookingStatus.CANCELLED
+                other_booking.save(update_fields=["status"])
+        relay_seat_events()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        assert len(response.data["takenSeats"]) == 2
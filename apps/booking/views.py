@@ -1,3 +1,5 @@
+import base64
+from django.core.cache import cache
 from django.utils import timezone
 from django.db import transaction
 from rest_framework import status, viewsets, permissions, mixins
@@ -5,14 +7,15 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from rest_framework.throttling import UserRateThrottle
-from rest_framework.exceptions import Throttled
 from drf_yasg.utils import swagger_auto_schema
 
+from apps.booking.events import seat_version
+from apps.booking.expiry import schedule_expiry
+from apps.booking.seatmap import session_bitmap, taken_seats_from_bitmap
 from apps.booking.models import Booking, Payment, BookingStatus, PaymentStatus
-from apps.schedule.models import Session, Seat
+from apps.common.pagination import CreatedAtCursorPagination
+from apps.common.throttling import RateLimitedMixin, RedisRateThrottle
+from apps.schedule.models import Session
 from .serializer import (
     BookingCreateSerializer,
     BookingListSerializer,
@@ -20,11 +23,16 @@ from .serializer import (
 )
 
 
-class BookingPostThrottle(UserRateThrottle):
+class BookingPostThrottle(RedisRateThrottle):
     scope = "booking"
 
 
+class PaymentThrottle(RedisRateThrottle):
+    scope = "payment"
+
+
 class BookingViewSet(
+    RateLimitedMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -34,10 +42,16 @@ class BookingViewSet(
         "seats"
     )
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     throttle_classes = []  # throttle на весь ViewSet не ставим
     lookup_field = "public_id"
     lookup_url_kwarg = "public_id"
 
+    def get_throttles(self):
+        if self.action == "create":
+            return [BookingPostThrottle()]
+        return super().get_throttles()
+
     def get_serializer_class(self):
         if self.action == "create":
             return BookingCreateSerializer
@@ -47,45 +61,13 @@ class BookingViewSet(
         return self.queryset.filter(user=self.request.user)
 
     @swagger_auto_schema(responses={status.HTTP_201_CREATED: BookingListSerializer})
-    @transaction.atomic
     def create(self, request, *args, **kwargs):
-        throttle = BookingPostThrottle()
-        if not throttle.allow_request(request, self):
-            raise Throttled(detail="Слишком много запросов, попробуйте через минуту")
-
         serializer = self.get_serializer(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
         booking = serializer.save()
-
-        booking.expires_at = timezone.now() + timezone.timedelta(minutes=15)
-
-        # Schedule a task to check for booking expiration
-        from .tasks import check_booking_expiration
-
-        task = check_booking_expiration.apply_async(
-            (booking.id,), eta=booking.expires_at
-        )
-        booking.task_id = task.id
-        booking.save()
-
-        channel_layer = get_channel_layer()
-        taken_seats = list(
-            Booking.objects.filter(
-                session_id=booking.session.id,
-                status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
-            )
-            .values_list("seats__id", flat=True)
-            .distinct()
-        )
-        async_to_sync(channel_layer.group_send)(
-            f"seat_updates_{booking.session.id}",
-            {
-                "type": "seat_update",
-                "taken_seats": taken_seats,
-            },
-        )
+        schedule_expiry(booking)
 
         output = BookingListSerializer(booking)
         return Response(output.data, status=status.HTTP_201_CREATED)
@@ -94,11 +76,6 @@ class BookingViewSet(
     def cancel_booking(self, request, public_id=None):
         booking = self.get_object()
         if booking.status in [BookingStatus.CONFIRMED, BookingStatus.PENDING]:
-            if booking.task_id:
-                from config.celery import app as celery_app
-
-                celery_app.control.revoke(booking.task_id)
-
             booking.status = BookingStatus.CANCELLED
             booking.save(update_fields=["status"])
             return Response({"detail": "Бронь успешно отменена."})
@@ -107,12 +84,15 @@ class BookingViewSet(
         )
 
 
-class PaymentAPIView(APIView):
+class PaymentAPIView(RateLimitedMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [PaymentThrottle]
 
     def post(self, request, booking_id):
         try:
-            booking = Booking.objects.get(public_id=booking_id, user=request.user)
+            booking = Booking.objects.select_related("session__hall").get(
+                public_id=booking_id, user=request.user
+            )
         except Booking.DoesNotExist:
             return Response(
                 {"error": "Бронь не найдена."}, status=status.HTTP_404_NOT_FOUND
@@ -135,58 +115,56 @@ class PaymentAPIView(APIView):
                 {"error": "Время брони истекло."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        if booking.task_id:
-            from config.celery import app as celery_app
-
-            celery_app.control.revoke(booking.task_id)
-
-        payment = Payment.objects.create(
-            booking=booking,
-            amount=booking.total_amount,
-            status=PaymentStatus.PAID,
-            paid_at=timezone.now(),
-        )
-
-        booking.status = BookingStatus.CONFIRMED
-        booking.save(update_fields=["status"])
-
-        channel_layer = get_channel_layer()
-        taken_seats = [
-            {"row_number": s.row_number, "seat_number": s.seat_number}
-            for s in booking.seats.all()
-        ]
-        async_to_sync(channel_layer.group_send)(
-            f"session_{booking.session.public_id}",
-            {
-                "type": "seat_update",
-                "session_id": str(booking.session.public_id),
-                "taken_seats": taken_seats,
-            },
-        )
+        with transaction.atomic():
+            booking.confirm()
+            payment = Payment.objects.create(
+                booking=booking,
+                amount=booking.total_amount,
+                status=PaymentStatus.PAID,
+                paid_at=timezone.now(),
+            )
 
         serializer = PaymentSerializer(payment)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 class SessionSeatsView(APIView):
+    """
+    Seat map snapshot of a session. Responses are cached per seat version,
+    which grows with every published seat change, so a change invalidates
+    the cached entry. A matching If-None-Match gets 304 without a DB hit.
+    """
+
     permission_classes = [AllowAny]
 
     def get(self, request, session_id):
-        try:
-            session = Session.objects.get(public_id=session_id)
-        except Session.DoesNotExist:
-            return Response({"error": "Сеанс не найден"}, status=404)
-
-        booked_seats = Seat.objects.filter(
-            bookings__session=session,
-            bookings__status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
-        ).distinct()
-
-        taken_seats = [
-            {"row_number": seat.row_number, "seat_number": seat.seat_number}
-            for seat in booked_seats
-        ]
-
-        return Response(
-            {"sessionId": str(session.public_id), "takenSeats": taken_seats}
+        encoding = (
+            "bitmap" if request.query_params.get("encoding") == "bitmap" else "json"
         )
+        version = seat_version(session_id)
+        etag = f'"{session_id}-{version}-{encoding}"'
+
+        if_none_match = request.headers.get("If-None-Match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        cache_key = f"session_seats_{session_id}_{version}_{encoding}"
+        data = cache.get(cache_key)
+        if data is None:
+            try:
+                session = Session.objects.select_related("hall").get(
+                    public_id=session_id
+                )
+            except Session.DoesNotExist:
+                return Response({"error": "Сеанс не найден"}, status=404)
+
+            index, bitmap = session_bitmap(session)
+            data = {"sessionId": str(session.public_id), "version": version}
+            if encoding == "bitmap":
+                data["seatCount"] = len(index["seats"])
+                data["bitmap"] = base64.b64encode(bitmap).decode()
+            else:
+                data["takenSeats"] = taken_seats_from_bitmap(index, bitmap)
+            cache.set(cache_key, data)
+
+        return Response(data, headers={"ETag": etag})
@@ -11,6 +11,13 @@ def custom_exception_handler(exc, context):
         except Exception:
             error_detail = "Ошибка сервера"
 
-        return Response({"error": error_detail}, status=response.status_code)
+        headers = {
+            name: response[name]
+            for name in ("Retry-After", "WWW-Authenticate")
+            if name in response
+        }
+        return Response(
+            {"error": error_detail}, status=response.status_code, headers=headers
+        )
 
     return Response({"error": "Внутренняя ошибка сервера"}, status=500)
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Newest first; pages are fetched by keyset on created_at, not OFFSET."""
+
+    ordering = ("-created_at", "-id")
+
+
+class StartTimeCursorPagination(CursorPagination):
+    """Earliest first; pages are fetched by keyset on start_time, not OFFSET."""
+
+    ordering = ("start_time", "id")
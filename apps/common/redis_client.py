@@ -0,0 +1,16 @@
+import redis
+from django.conf import settings
+
+
+_client = None
+
+
+def get_redis():
+    """
+    Returns a process-wide Redis client for state that needs native Redis
+    commands (TTL, sorted sets, Lua) rather than the Django cache API.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
@@ -0,0 +1,67 @@
+import threading
+import time
+from unittest.mock import patch
+
+from apps.common.local_cache import LocalCache
+
+
+class TestLocalCache:
+    def test_evicts_least_recently_used(self):
+        local_cache = LocalCache(max_entries=2, ttl=60)
+        local_cache.set("a", 1)
+        local_cache.set("b", 2)
+        assert local_cache.get("a") == 1
+
+        local_cache.set("c", 3)
+
+        assert len(local_cache) == 2
+        assert local_cache.get("b") is None
+        assert local_cache.get("a") == 1
+        assert local_cache.get("c") == 3
+
+    def test_entries_expire_after_ttl(self):
+        local_cache = LocalCache(max_entries=2, ttl=60)
+        local_cache.set("a", 1)
+
+        with patch(
+            "apps.common.local_cache.time.monotonic", return_value=time.monotonic() + 61
+        ):
+            assert local_cache.get("a") is None
+        assert len(local_cache) == 0
+
+    def test_delete_prefix(self):
+        local_cache = LocalCache(max_entries=10, ttl=60)
+        local_cache.set("movies_list_all", 1)
+        local_cache.set("movies_list_dune", 2)
+        local_cache.set("other", 3)
+
+        local_cache.delete_prefix("movies_list_")
+
+        assert len(local_cache) == 1
+        assert local_cache.get("other") == 3
+
+    def test_get_or_compute_runs_once_per_key(self):
+        local_cache = LocalCache(max_entries=10, ttl=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    local_cache.get_or_compute("key", compute)
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 5
@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+import pytest
+import redis
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.test import APIRequestFactory
+
+from apps.common.throttling import IPRateThrottle, RedisRateThrottle
+
+
+class BurstThrottle(RedisRateThrottle):
+    scope = "burst"
+    rate = "3/min"
+
+
+class LoginBurstThrottle(IPRateThrottle):
+    scope = "login_burst"
+    rate = "1/min"
+
+
+def make_request(user=None, ip="10.0.0.1"):
+    request = APIRequestFactory().post("/", REMOTE_ADDR=ip)
+    request.user = user or AnonymousUser()
+    return request
+
+
+@pytest.mark.django_db
+class TestRedisRateThrottle:
+    def test_burst_then_reject(self):
+        request = make_request()
+        throttle = BurstThrottle()
+        assert [throttle.allow_request(request, None) for _ in range(3)] == [
+            True,
+            True,
+            True,
+        ]
+
+        assert not throttle.allow_request(request, None)
+        # следующий запрос освободится через period / limit
+        assert 0 < throttle.wait() <= 20
+
+    def test_keyed_by_user_then_ip(self, user):
+        throttle = BurstThrottle()
+        for _ in range(3):
+            assert throttle.allow_request(make_request(), None)
+        assert not throttle.allow_request(make_request(), None)
+
+        assert throttle.allow_request(make_request(user=user), None)
+        assert throttle.allow_request(make_request(ip="10.0.0.2"), None)
+
+    def test_ip_throttle_ignores_user(self, user):
+        throttle = LoginBurstThrottle()
+        assert throttle.allow_request(make_request(user=user), None)
+        assert not throttle.allow_request(make_request(), None)
+
+    def test_redis_error_lets_request_through(self):
+        with patch(
+            "apps.common.throttling.get_redis",
+            side_effect=redis.ConnectionError("down"),
+        ):
+            assert BurstThrottle().allow_request(make_request(), None)
@@ -0,0 +1,12 @@
+from django.db import connection
+
+
+def explain(queryset):
+    """
+    Returns the query plan of ``queryset`` with sequential scans disabled
+    for the current transaction: on the near-empty test tables the planner
+    would otherwise pick a seq scan over any index.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
@@ -0,0 +1,114 @@
+"""
+Rate limiting on Redis with GCRA (generic cell rate algorithm).
+
+Each client of a scope is a single Redis key holding its "theoretical arrival
+time"; one Lua script reads and advances it atomically, so a check is one
+round trip and O(1) no matter how high the rate is. Rates come from
+REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] by scope, as with DRF throttles:
+"10/min" allows a burst of 10 requests, then one every 6 seconds.
+"""
+
+import logging
+
+import redis
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import SimpleRateThrottle
+
+from apps.common.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = t[1] * 1000000 + t[2]
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, allow_at - now}
+end
+
+redis.call('SET', KEYS[1], string.format('%d', new_tat),
+    'PX', math.ceil((new_tat - now) / 1000))
+return {1, 0}
+"""
+
+
+class RateLimited(Throttled):
+    default_detail = "Слишком много запросов"
+    extra_detail_singular = extra_detail_plural = "Повторите через {wait} с."
+
+
+class RateLimitedMixin:
+    """Answers throttled requests with a Russian message and Retry-After."""
+
+    def throttled(self, request, wait):
+        raise RateLimited(wait)
+
+
+class RedisRateThrottle(SimpleRateThrottle):
+    """
+    GCRA throttle keyed by the authenticated user, or by client IP for
+    anonymous requests. Redis errors let the request through.
+    """
+
+    cache_format = "ratelimit:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        super().__init__()
+        self.retry_after = None
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        period = self.duration * 1_000_000
+        try:
+            allowed, retry_after = get_redis().eval(
+                GCRA_SCRIPT, 1, key, period // self.num_requests, period
+            )
+        except redis.RedisError as exc:
+            logger.warning(f"Rate limiter unavailable for {key}: {exc}")
+            return True
+
+        self.retry_after = retry_after / 1_000_000
+        return bool(allowed)
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPRateThrottle(RedisRateThrottle):
+    """
+    Keyed by client IP only, for endpoints used before authentication.
+    X-Forwarded-For is trusted only as far as REST_FRAMEWORK["NUM_PROXIES"]
+    allows; with the default of 0 the key is REMOTE_ADDR.
+    """
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class UserRedisThrottle(RedisRateThrottle):
+    scope = "user"
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movies", "0002_alter_movie_id"),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddIndex(
+            model_name="movie",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "title", "description", config="russian"
+                ),
+                name="movie_search_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass("title", name="gin_trgm_ops"),
+                name="movie_title_trgm_idx",
+            ),
+        ),
+    ]
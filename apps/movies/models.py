@@ -1,8 +1,14 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.db import models
 
 from apps.common.abstract import AbstractModel
 
 
+# Выражение должно совпадать с индексом movie_search_idx, иначе он не используется
+MOVIE_SEARCH_VECTOR = SearchVector("title", "description", config="russian")
+
+
 class Movie(AbstractModel, models.Model):
     title = models.CharField(
         max_length=255, verbose_name="Название фильма", db_index=True
@@ -14,6 +20,12 @@ class Movie(AbstractModel, models.Model):
     class Meta:
         verbose_name = "Фильм"
         verbose_name_plural = "Фильмы"
+        indexes = [
+            GinIndex(MOVIE_SEARCH_VECTOR, name="movie_search_idx"),
+            GinIndex(
+                OpClass("title", name="gin_trgm_ops"), name="movie_title_trgm_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title
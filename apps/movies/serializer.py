@@ -1,7 +1,12 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from .models import Movie
 from apps.common.abstract import AbstractSerializer
+from apps.schedule.grid import invalidate_schedule_grid
+from apps.schedule.models import Session, is_overlap_error
+from apps.schedule.serializer import duration_overlap_message
 
 
 class MovieSerializer(AbstractSerializer, serializers.ModelSerializer):
@@ -25,3 +30,23 @@ class MovieSerializer(AbstractSerializer, serializers.ModelSerializer):
                 "Продолжительность фильма должна быть больше 0 минут"
             )
         return value
+
+    def update(self, instance, validated_data):
+        # end_time сеансов зависит от продолжительности, её проверяет ограничение
+        duration = instance.duration
+        try:
+            with transaction.atomic():
+                movie = super().update(instance, validated_data)
+                if movie.duration != duration:
+                    Session.refresh_end_times(movie)
+                    sessions = list(
+                        movie.movie_sessions.filter(start_time__gte=timezone.now())
+                    )
+                    transaction.on_commit(lambda: invalidate_schedule_grid(*sessions))
+        except IntegrityError as exc:
+            if not is_overlap_error(exc):
+                raise
+            raise serializers.ValidationError(
+                {"duration": duration_overlap_message(instance)}
+            )
+        return movie
@@ -1,8 +1,13 @@
 import pytest
+from datetime import timedelta
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from apps.movies.models import Movie
+from apps.movies.views import local_cache, movies_cache_version
+from apps.schedule.models import Session
+
 
 @pytest.mark.django_db
 class TestMovieViewSet:
@@ -20,6 +25,50 @@ class TestMovieViewSet:
         assert response.data["count"] >= 1
         assert response.data["results"][0]["title"] == movie.title
 
+    def test_search_movies_ranked_by_relevance(self, user, movie):
+        Movie.objects.create(
+            title="Дюна (2021)",
+            description="Пол Атрейдес отправляется на пустынную планету Арракис.",
+            duration=155,
+            poster_url="https://example.com/dune.jpg",
+        )
+        Movie.objects.create(
+            title="Пустыня (2019)",
+            description="Документальный фильм о пустынях.",
+            duration=90,
+            poster_url="https://example.com/desert.jpg",
+        )
+        self.client.force_authenticate(user=user)
+
+        response = self.client.get(self.list_create_endpoint, {"search": "дюн"})
+        assert [m["title"] for m in response.data["results"]] == ["Дюна (2021)"]
+
+        response = self.client.get(self.list_create_endpoint, {"search": "пустыня"})
+        assert [m["title"] for m in response.data["results"]] == [
+            "Пустыня (2019)",
+            "Дюна (2021)",
+        ]
+
+    def test_create_movie_invalidates_list_cache_in_all_workers(self, superuser, movie):
+        self.client.force_authenticate(user=superuser)
+        count = self.client.get(self.list_create_endpoint).data["count"]
+        version = movies_cache_version()
+
+        data = {
+            "title": "Cached Movie (2023)",
+            "description": "A film.",
+            "duration": 100,
+            "poster_url": "https://example.com/cached_poster.jpg",
+        }
+        response = self.client.post(self.list_create_endpoint, data)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert movies_cache_version() == version + 1
+
+        # другой воркер: локального кеша нет, общий кеш должен быть сброшен
+        local_cache.clear()
+        response = self.client.get(self.list_create_endpoint)
+        assert response.data["count"] == count + 1
+
     def test_create_movie_by_regular_user_fails(self, user):
         self.client.force_authenticate(user=user)
         data = {
@@ -72,6 +121,41 @@ class TestMovieViewSet:
         movie.refresh_from_db()
         assert movie.title == data["title"]
 
+    def test_duration_update_recomputes_session_end_time(
+        self, movie, session, superuser
+    ):
+        self.client.force_authenticate(user=superuser)
+        endpoint = self.get_detail_endpoint(movie.public_id)
+        response = self.client.patch(endpoint, {"duration": movie.duration + 30})
+
+        assert response.status_code == status.HTTP_200_OK
+        session.refresh_from_db()
+        assert session.end_time == session.start_time + timedelta(
+            minutes=movie.duration + 30
+        )
+
+    def test_duration_update_rejected_when_sessions_overlap(
+        self, movie, session, superuser
+    ):
+        following = Session.objects.create(
+            movie=movie,
+            hall=session.hall,
+            start_time=session.end_time + timedelta(minutes=15),
+            price=session.price,
+        )
+        self.client.force_authenticate(user=superuser)
+        endpoint = self.get_detail_endpoint(movie.public_id)
+        response = self.client.patch(endpoint, {"duration": movie.duration + 30})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(session.public_id) in str(response.data)
+        assert str(following.public_id) in str(response.data)
+        movie.refresh_from_db()
+        session.refresh_from_db()
+        assert session.end_time == session.start_time + timedelta(
+            minutes=movie.duration
+        )
+
     def test_delete_movie_by_regular_user_fails(self, movie, user):
         self.client.force_authenticate(user=user)
         endpoint = self.get_detail_endpoint(movie.public_id)
@@ -1,50 +1,101 @@
 from rest_framework import filters
 from rest_framework.exceptions import ValidationError
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
 from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
 import time
 
+from apps.common.local_cache import LocalCache
 from apps.common.viewsets import BaseCRUDViewSet
 from .serializer import MovieSerializer
-from .models import Movie
+from .models import MOVIE_SEARCH_VECTOR, Movie
 
 
-local_cache = {}
 LOCAL_TTL = 60
+LOCAL_MAX_ENTRIES = 256
+local_cache = LocalCache(max_entries=LOCAL_MAX_ENTRIES, ttl=LOCAL_TTL)
 
 
 def safe_cache_get(key):
-    value = cache.get(key)
+    value = local_cache.get(key)
     if value is not None:
         return value
 
-    entry = local_cache.get(key)
-    if entry:
-        data, expires = entry
-        if time.time() < expires:
-            return data
-        local_cache.pop(key, None)
-    return None
+    try:
+        value = cache.get(key)
+    except Exception:
+        return None
+    if value is not None:
+        local_cache.set(key, value)
+    return value
 
 
 def safe_cache_set(key, value):
-    cache.set(key, value, LOCAL_TTL)
-    local_cache[key] = (value, time.time() + LOCAL_TTL)
+    local_cache.set(key, value)
+    try:
+        cache.set(key, value, LOCAL_TTL)
+    except Exception:
+        pass
+
+
+MOVIES_CACHE_VERSION_KEY = "movies_cache_version"
+
+
+def movies_cache_version():
+    try:
+        return cache.get_or_set(MOVIES_CACHE_VERSION_KEY, int(time.time()), None)
+    except Exception:
+        return 0
 
 
 def clear_movies_cache():
-    for key in list(local_cache.keys()):
-        if key.startswith("movies_list_"):
-            del local_cache[key]
+    """
+    Invalidates every cached movie list in all workers at once by bumping
+    the generation baked into the cache keys. Old entries simply expire.
+    """
+    local_cache.delete_prefix("movies_list_")
     try:
-        cache.delete_pattern("movies_list_*")
+        cache.incr(MOVIES_CACHE_VERSION_KEY)
+    except ValueError:
+        # счётчик вытеснен: начинаем с метки времени, она больше старых версий
+        cache.add(MOVIES_CACHE_VERSION_KEY, int(time.time()), None)
     except Exception:
         pass
 
 
+class MovieSearchFilter(filters.SearchFilter):
+    """
+    Indexed search on PostgreSQL: full-text match over title and description
+    or trigram word similarity on the title, best matches first. Other
+    databases fall back to the plain SearchFilter lookup.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search = request.query_params.get(self.search_param, "").strip()
+        if not search or connection.vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        query = SearchQuery(search, config="russian", search_type="websearch")
+        return (
+            queryset.annotate(
+                search=MOVIE_SEARCH_VECTOR,
+                rank=SearchRank(MOVIE_SEARCH_VECTOR, query),
+                similarity=TrigramWordSimilarity(search, "title"),
+            )
+            .filter(Q(search=query) | Q(title__trigram_word_similar=search))
+            .order_by("-rank", "-similarity", "id")
+        )
+
+
 class MovieViewSet(BaseCRUDViewSet):
     queryset = Movie.objects.all()
     serializer_class = MovieSerializer
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [MovieSearchFilter]
     filterset_fields = {"start_time": ["date"]}
     search_fields = ["title"]
     object_verbose_name = "Фильм"
@@ -57,15 +108,20 @@ class MovieViewSet(BaseCRUDViewSet):
 
     def list(self, request, *args, **kwargs):
         search_param = request.query_params.get("search", "").strip().lower()
-        cache_key = f"movies_list_{search_param or 'all'}"
-
-        cached_data = safe_cache_get(cache_key)
-        if cached_data:
-            return self.get_response(cached_data)
+        page = request.query_params.get("page", "1")
+        cache_key = (
+            f"movies_list_{movies_cache_version()}_{search_param or 'all'}_{page}"
+        )
+
+        def load():
+            data = safe_cache_get(cache_key)
+            if data is None:
+                data = super(MovieViewSet, self).list(request, *args, **kwargs).data
+                safe_cache_set(cache_key, data)
+            return data
 
-        response = super().list(request, *args, **kwargs)
-        safe_cache_set(cache_key, response.data)
-        return response
+        # один поток на ключ пересчитывает список, остальные ждут результат
+        return self.get_response(local_cache.get_or_compute(cache_key, load))
 
     def get_response(self, data):
         from rest_framework.response import Response
@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Hall, Session, Seat
+from .models import Hall, Session, Seat, ShowtimeTemplate
 
 admin.site.register(Hall)
 admin.site.register(Seat)
 admin.site.register(Session)
+admin.site.register(ShowtimeTemplate)
@@ -0,0 +1,110 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.booking.models import ACTIVE_BOOKING_STATUSES, Booking
+from .models import Seat, Session
+
+
+SCHEDULE_GRID_TIMEOUT = 5 * 60
+
+
+def local_day_bounds(day):
+    """
+    Returns the half-open ``[local midnight, next local midnight)`` range of
+    ``day`` in the current time zone, for index-friendly start_time lookups.
+    """
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(day, time.min, tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+    return start, end
+
+
+def _grid_key(day):
+    return f"schedule_grid_{day.isoformat()}"
+
+
+def _count(queryset, group_by):
+    return Coalesce(
+        Subquery(queryset.values(group_by).annotate(count=Count("*")).values("count")),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _build_schedule_grid(day):
+    start, end = local_day_bounds(day)
+    sessions = (
+        Session.objects.filter(start_time__gte=start, start_time__lt=end)
+        .select_related("movie", "hall")
+        .annotate(
+            total=_count(Seat.objects.filter(hall=OuterRef("hall")), "hall"),
+            taken=_count(
+                Booking.seats.through.objects.filter(
+                    booking__session=OuterRef("pk"),
+                    booking__status__in=ACTIVE_BOOKING_STATUSES,
+                ),
+                "booking__session",
+            ),
+        )
+        .order_by("movie__title", "hall__name", "start_time")
+    )
+
+    movies = {}
+    for session in sessions:
+        movie = movies.setdefault(
+            session.movie_id,
+            {
+                "id": str(session.movie.public_id),
+                "title": session.movie.title,
+                "duration": session.movie.duration,
+                "halls": {},
+            },
+        )
+        hall = movie["halls"].setdefault(
+            session.hall_id,
+            {
+                "id": str(session.hall.public_id),
+                "name": session.hall.name,
+                "sessions": [],
+            },
+        )
+        hall["sessions"].append(
+            {
+                "id": str(session.public_id),
+                "start_time": timezone.localtime(session.start_time).isoformat(),
+                "price": str(session.price),
+                "total": session.total,
+                "free": max(session.total - session.taken, 0),
+            }
+        )
+
+    return {
+        "date": day.isoformat(),
+        "movies": [
+            {**movie, "halls": list(movie["halls"].values())}
+            for movie in movies.values()
+        ],
+    }
+
+
+def schedule_grid(day):
+    """
+    Every session of ``day`` grouped by movie and hall, with free and total
+    seat counts from one aggregate query. Cached per date.
+    """
+    key = _grid_key(day)
+    grid = cache.get(key)
+    if grid is None:
+        grid = _build_schedule_grid(day)
+        cache.set(key, grid, SCHEDULE_GRID_TIMEOUT)
+    return grid
+
+
+def invalidate_schedule_grid(*sessions):
+    cache.delete_many(
+        {_grid_key(timezone.localdate(session.start_time)) for session in sessions}
+    )
@@ -0,0 +1,185 @@
+"""
+Bulk session import: the whole batch is validated up front, movies and halls
+are resolved with one query each, and the sessions are inserted with a single
+bulk_create. Nothing is written if any row has an error.
+"""
+
+import csv
+import io
+import json
+from collections import defaultdict
+from decimal import Decimal
+from uuid import UUID
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from apps.movies.models import Movie
+from .grid import invalidate_schedule_grid
+from .models import Hall, Session, is_overlap_error
+
+
+IMPORT_FIELDS = ("movie", "hall", "start_time", "price")
+# те же пределы, что у Session.price, чтобы bulk_create не упал на numeric(10, 2)
+PRICE_FIELD = serializers.DecimalField(
+    max_digits=10, decimal_places=2, min_value=Decimal("0.01")
+)
+
+
+class SessionImportError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def parse_sessions(content, fmt):
+    """Parses a JSON array or a CSV file with IMPORT_FIELDS columns."""
+    try:
+        if fmt == "csv":
+            return list(csv.DictReader(io.StringIO(content)))
+        rows = json.loads(content)
+    except (csv.Error, ValueError) as exc:
+        raise SessionImportError(
+            [{"row": None, "error": f"Не удалось прочитать файл: {exc}"}]
+        )
+    return session_rows(rows)
+
+
+def session_rows(data):
+    """Unwraps a list of sessions or {"sessions": [...]} from decoded JSON."""
+    if isinstance(data, dict):
+        data = data.get("sessions")
+    if not isinstance(data, list):
+        raise SessionImportError([{"row": None, "error": "Ожидается список сеансов"}])
+    return data
+
+
+def _parse_row(row):
+    if not isinstance(row, dict):
+        raise ValueError("Строка должна быть объектом")
+    missing = [field for field in IMPORT_FIELDS if not row.get(field)]
+    if missing:
+        raise ValueError(f"Не заполнены поля: {', '.join(missing)}")
+
+    try:
+        movie_id = UUID(str(row["movie"]))
+        hall_id = UUID(str(row["hall"]))
+    except ValueError:
+        raise ValueError("Параметры 'movie' и 'hall' должны быть UUID")
+
+    start_time = parse_datetime(str(row["start_time"]))
+    if start_time is None:
+        raise ValueError("Неверный формат start_time, используйте ISO 8601")
+    if timezone.is_naive(start_time):
+        start_time = timezone.make_aware(start_time)
+
+    try:
+        price = PRICE_FIELD.run_validation(str(row["price"]))
+    except serializers.ValidationError as exc:
+        raise ValueError(f"Неверная цена: {' '.join(exc.detail)}")
+
+    return movie_id, hall_id, start_time, price
+
+
+def _overlap_error(item, other):
+    if item[0] is None:
+        item, other = other, item
+    number, _ = item
+    other_number, other_session = other
+    if other_number is None:
+        return {
+            "row": number,
+            "error": f"Пересекается с сеансом {other_session.public_id}",
+        }
+    return {"row": number, "error": f"Пересекается со строкой {other_number}"}
+
+
+def _check_overlaps(sessions, errors):
+    """
+    Sweeps each hall's new and already stored sessions in start order;
+    stored ones are loaded with one query over the batch's time window.
+    """
+    by_hall = defaultdict(list)
+    for item in sessions:
+        by_hall[item[1].hall_id].append(item)
+
+    start = min(session.start_time for _, session in sessions)
+    end = max(session.end_time for _, session in sessions)
+    for existing in Session.objects.filter(
+        hall_id__in=by_hall, start_time__lt=end, end_time__gt=start
+    ):
+        by_hall[existing.hall_id].append((None, existing))
+
+    for hall_sessions in by_hall.values():
+        hall_sessions.sort(key=lambda item: item[1].start_time)
+        latest = None
+        for item in hall_sessions:
+            if latest is not None and item[1].start_time < latest[1].end_time:
+                errors.append(_overlap_error(item, latest))
+            if latest is None or item[1].end_time > latest[1].end_time:
+                latest = item
+
+
+def import_sessions(rows):
+    """
+    Validates and inserts ``rows`` (dicts with IMPORT_FIELDS) in one
+    transaction. Returns the created sessions; raises SessionImportError
+    with per-row errors (1-based ``row``) if anything is invalid.
+    """
+    if not rows:
+        raise SessionImportError([{"row": None, "error": "Нет сеансов для импорта"}])
+
+    errors = []
+    parsed = []
+    for number, row in enumerate(rows, start=1):
+        try:
+            parsed.append((number, _parse_row(row)))
+        except ValueError as exc:
+            errors.append({"row": number, "error": str(exc)})
+
+    movies = Movie.objects.in_bulk(
+        {movie_id for _, (movie_id, *_) in parsed}, field_name="public_id"
+    )
+    halls = Hall.objects.in_bulk(
+        {hall_id for _, (_, hall_id, *_) in parsed}, field_name="public_id"
+    )
+
+    sessions = []
+    for number, (movie_id, hall_id, start_time, price) in parsed:
+        if movie_id not in movies:
+            errors.append({"row": number, "error": f"Фильм {movie_id} не найден"})
+            continue
+        if hall_id not in halls:
+            errors.append({"row": number, "error": f"Зал {hall_id} не найден"})
+            continue
+        session = Session(
+            movie=movies[movie_id],
+            hall=halls[hall_id],
+            start_time=start_time,
+            price=price,
+        )
+        session.set_end_time()
+        sessions.append((number, session))
+
+    if sessions:
+        _check_overlaps(sessions, errors)
+    if errors:
+        raise SessionImportError(sorted(errors, key=lambda error: error["row"] or 0))
+
+    try:
+        with transaction.atomic():
+            created = Session.objects.bulk_create(
+                [session for _, session in sessions], batch_size=500
+            )
+    except IntegrityError as exc:
+        if not is_overlap_error(exc):
+            raise
+        # параллельно создан пересекающийся сеанс
+        raise SessionImportError(
+            [{"row": None, "error": "Сеансы пересекаются с уже созданными"}]
+        )
+
+    invalidate_schedule_grid(*created)
+    return created
@@ -0,0 +1,68 @@
+import zlib
+
+from django.core.cache import cache
+
+from .models import Seat
+
+
+HALL_LAYOUT_TIMEOUT = 60 * 60
+
+
+def _seat_index_key(hall):
+    return f"hall_seat_index_{hall.public_id}"
+
+
+def hall_seat_index(hall):
+    """
+    Returns the hall's seats as ``[seat_id, row_number, seat_number]`` in
+    ``Seat.Meta.ordering``, so a seat's position is a stable bit index.
+    ``version`` changes whenever the set or order of seats changes.
+    """
+    key = _seat_index_key(hall)
+    index = cache.get(key)
+    if index is None:
+        seats = [
+            list(seat)
+            for seat in Seat.objects.filter(hall=hall).values_list(
+                "id", "row_number", "seat_number"
+            )
+        ]
+        version = zlib.crc32(",".join(str(seat[0]) for seat in seats).encode())
+        index = {"version": f"{version:08x}", "seats": seats}
+        cache.set(key, index, HALL_LAYOUT_TIMEOUT)
+    return index
+
+
+def _compact_layout_key(hall):
+    return f"hall_compact_layout_{hall.public_id}"
+
+
+def hall_compact_layout(hall):
+    """
+    Returns the hall layout as row lengths: ``{"row_number", "seats"}`` per
+    row, in the same shape ``HallSerializer`` accepts as ``rows``. Rows with
+    gaps in seat numbering also get ``runs`` of ``[first_seat, length]``.
+    """
+    key = _compact_layout_key(hall)
+    layout = cache.get(key)
+    if layout is None:
+        runs_by_row = {}
+        for _, row_number, seat_number in hall_seat_index(hall)["seats"]:
+            runs = runs_by_row.setdefault(row_number, [])
+            if runs and runs[-1][0] + runs[-1][1] == seat_number:
+                runs[-1][1] += 1
+            else:
+                runs.append([seat_number, 1])
+
+        layout = []
+        for row_number, runs in runs_by_row.items():
+            row = {"row_number": row_number, "seats": sum(run[1] for run in runs)}
+            if runs != [[1, row["seats"]]]:
+                row["runs"] = runs
+            layout.append(row)
+        cache.set(key, layout, HALL_LAYOUT_TIMEOUT)
+    return layout
+
+
+def invalidate_hall_layout(hall):
+    cache.delete_many([_seat_index_key(hall), _compact_layout_key(hall)])
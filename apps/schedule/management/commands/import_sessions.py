@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.schedule.importer import SessionImportError, import_sessions, parse_sessions
+
+
+class Command(BaseCommand):
+    help = "Массовый импорт сеансов из CSV или JSON (movie, hall, start_time, price)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу .csv или .json")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "json"],
+            help="Формат файла, по умолчанию по расширению",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"Файл не найден: {path}")
+        fmt = options["format"] or ("csv" if path.suffix.lower() == ".csv" else "json")
+
+        try:
+            content = path.read_text(encoding="utf-8-sig")
+        except UnicodeDecodeError:
+            raise CommandError("Файл должен быть в кодировке UTF-8")
+
+        try:
+            created = import_sessions(parse_sessions(content, fmt))
+        except SessionImportError as exc:
+            for error in exc.errors:
+                row = error["row"] if error["row"] is not None else "-"
+                self.stderr.write(f"Строка {row}: {error['error']}")
+            raise CommandError("Импорт не выполнен")
+
+        self.stdout.write(self.style.SUCCESS(f"Импортировано сеансов: {len(created)}"))
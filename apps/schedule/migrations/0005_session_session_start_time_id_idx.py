@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movies", "0003_search_indexes"),
+        ("schedule", "0004_rename_hall_id_session_hall_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(
+                fields=["start_time", "id"], name="session_start_time_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movies", "0003_search_indexes"),
+        ("schedule", "0005_session_session_start_time_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(
+                fields=["hall", "start_time"], name="session_hall_start_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(
+                fields=["movie", "start_time"], name="session_movie_start_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import apps.schedule.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.operations
+from django.db import migrations, models
+
+
+def fill_end_time(apps, schema_editor):
+    Session = apps.get_model("schedule", "Session")
+    sessions = list(Session.objects.select_related("movie"))
+    for session in sessions:
+        session.end_time = session.start_time + timedelta(
+            minutes=session.movie.duration
+        )
+    Session.objects.bulk_update(sessions, ["end_time"], batch_size=500)
+
+
+def check_overlaps(apps, schema_editor):
+    Session = apps.get_model("schedule", "Session")
+    conflicts = Session.objects.filter(
+        hall_id=models.OuterRef("hall_id"),
+        start_time__lt=models.OuterRef("end_time"),
+        end_time__gt=models.OuterRef("start_time"),
+    ).exclude(pk=models.OuterRef("pk"))
+    overlapping = (
+        Session.objects.filter(models.Exists(conflicts))
+        .select_related("hall")
+        .order_by("hall_id", "start_time")
+    )
+    if overlapping:
+        raise RuntimeError(
+            "Пересекающиеся сеансы, исправьте их перед миграцией:\n"
+            + "\n".join(
+                f"  {session.public_id}: зал {session.hall.name}, "
+                f"{session.start_time:%Y-%m-%d %H:%M}–{session.end_time:%H:%M} UTC"
+                for session in overlapping
+            )
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("schedule", "0006_hot_query_indexes"),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.AddField(
+            model_name="session",
+            name="end_time",
+            field=models.DateTimeField(
+                editable=False, null=True, verbose_name="Время окончания сеанса"
+            ),
+        ),
+        migrations.RunPython(fill_end_time, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="session",
+            name="end_time",
+            field=models.DateTimeField(
+                editable=False, verbose_name="Время окончания сеанса"
+            ),
+        ),
+        migrations.RunPython(check_overlaps, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="session",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    (
+                        apps.schedule.models.TsTzRange("start_time", "end_time"),
+                        "&&",
+                    ),
+                    ("hall", "="),
+                ],
+                name="exclude_overlapping_hall_sessions",
+            ),
+        ),
+    ]
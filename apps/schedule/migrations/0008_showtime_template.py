@@ -0,0 +1,112 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:34
+
+import apps.schedule.models
+import django.contrib.postgres.fields
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movies", "0003_search_indexes"),
+        ("schedule", "0007_session_overlap_constraint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShowtimeTemplate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "public_id",
+                    models.UUIDField(
+                        db_index=True, default=uuid.uuid4, editable=False, unique=True
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "times",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.TimeField(),
+                        size=None,
+                        verbose_name="Время начала сеансов",
+                    ),
+                ),
+                (
+                    "weekdays",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveSmallIntegerField(),
+                        default=apps.schedule.models.all_weekdays,
+                        size=None,
+                        verbose_name="Дни недели (0 — понедельник)",
+                    ),
+                ),
+                ("start_date", models.DateField(verbose_name="Первый день")),
+                ("end_date", models.DateField(verbose_name="Последний день")),
+                (
+                    "price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Стоимость билета"
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, verbose_name="Активен"),
+                ),
+                (
+                    "generated_until",
+                    models.DateField(
+                        blank=True,
+                        editable=False,
+                        null=True,
+                        verbose_name="Сеансы созданы по",
+                    ),
+                ),
+                (
+                    "hall",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="showtime_templates",
+                        to="schedule.hall",
+                        verbose_name="Зал",
+                    ),
+                ),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="showtime_templates",
+                        to="movies.movie",
+                        verbose_name="Фильм",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Шаблон расписания",
+                "verbose_name_plural": "Шаблоны расписания",
+                "ordering": ["start_date"],
+            },
+        ),
+        migrations.AddField(
+            model_name="session",
+            name="template",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="sessions",
+                to="schedule.showtimetemplate",
+                verbose_name="Шаблон расписания",
+            ),
+        ),
+    ]
@@ -1,3 +1,11 @@
+from datetime import timedelta
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    ArrayField,
+    DateTimeRangeField,
+    RangeOperators,
+)
 from django.db import models
 
 from apps.movies.models import Movie
@@ -5,6 +13,20 @@ from apps.movies.models import Movie
 from apps.common.abstract import AbstractModel
 
 
+OVERLAP_CONSTRAINT = "exclude_overlapping_hall_sessions"
+
+
+def is_overlap_error(exc):
+    """True if the IntegrityError ``exc`` comes from the hall overlap constraint."""
+    diag = getattr(exc.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == OVERLAP_CONSTRAINT
+
+
+class TsTzRange(models.Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
 class Hall(AbstractModel):
     name = models.CharField(max_length=255, unique=True, verbose_name="Название зала")
 
@@ -48,14 +70,116 @@ class Session(AbstractModel):
         Hall, on_delete=models.CASCADE, related_name="hall_sessions", verbose_name="Зал"
     )
     start_time = models.DateTimeField(verbose_name="Время начала сеанса")
+    end_time = models.DateTimeField(
+        editable=False, verbose_name="Время окончания сеанса"
+    )
     price = models.DecimalField(
         max_digits=10, decimal_places=2, verbose_name="Стоимость билета"
     )
+    template = models.ForeignKey(
+        "ShowtimeTemplate",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="sessions",
+        verbose_name="Шаблон расписания",
+    )
 
     class Meta:
         verbose_name = "Сеанс"
         verbose_name_plural = "Сеансы"
         ordering = ["start_time"]
+        indexes = [
+            models.Index(fields=["start_time", "id"], name="session_start_time_id_idx"),
+            models.Index(fields=["hall", "start_time"], name="session_hall_start_idx"),
+            models.Index(
+                fields=["movie", "start_time"], name="session_movie_start_idx"
+            ),
+        ]
+        constraints = [
+            # сеансы одного зала не пересекаются по [start_time, end_time)
+            ExclusionConstraint(
+                name=OVERLAP_CONSTRAINT,
+                expressions=[
+                    (TsTzRange("start_time", "end_time"), RangeOperators.OVERLAPS),
+                    ("hall", RangeOperators.EQUAL),
+                ],
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.set_end_time()
+        super().save(*args, **kwargs)
+
+    def set_end_time(self):
+        self.end_time = self.start_time + timedelta(minutes=self.movie.duration)
+
+    @classmethod
+    def refresh_end_times(cls, movie):
+        """Recomputes end_time of the movie's sessions after a duration change."""
+        return cls.objects.filter(movie=movie).update(
+            end_time=models.F("start_time") + timedelta(minutes=movie.duration)
+        )
+
+    def overlapping_sessions(self):
+        return (
+            Session.objects.filter(
+                hall_id=self.hall_id,
+                start_time__lt=self.end_time,
+                end_time__gt=self.start_time,
+            )
+            .exclude(pk=self.pk)
+            .select_related("movie")
+        )
 
     def __str__(self):
         return f"{self.movie.title} — {self.hall.name} ({self.start_time:%d.%m %H:%M})"
+
+
+def all_weekdays():
+    return list(range(7))
+
+
+class ShowtimeTemplate(AbstractModel):
+    """
+    Recurring showtimes of a movie in a hall, e.g. 18:00 and 21:00 every day
+    for three weeks. Sessions are materialized over a rolling horizon by
+    materialize_showtimes; ``generated_until`` is the last day already done.
+    """
+
+    movie = models.ForeignKey(
+        Movie,
+        on_delete=models.CASCADE,
+        related_name="showtime_templates",
+        verbose_name="Фильм",
+    )
+    hall = models.ForeignKey(
+        Hall,
+        on_delete=models.CASCADE,
+        related_name="showtime_templates",
+        verbose_name="Зал",
+    )
+    times = ArrayField(models.TimeField(), verbose_name="Время начала сеансов")
+    weekdays = ArrayField(
+        models.PositiveSmallIntegerField(),
+        default=all_weekdays,
+        verbose_name="Дни недели (0 — понедельник)",
+    )
+    start_date = models.DateField(verbose_name="Первый день")
+    end_date = models.DateField(verbose_name="Последний день")
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="Стоимость билета"
+    )
+    is_active = models.BooleanField(default=True, verbose_name="Активен")
+    generated_until = models.DateField(
+        null=True, blank=True, editable=False, verbose_name="Сеансы созданы по"
+    )
+
+    class Meta:
+        verbose_name = "Шаблон расписания"
+        verbose_name_plural = "Шаблоны расписания"
+        ordering = ["start_date"]
+
+    def __str__(self):
+        times = ", ".join(f"{t:%H:%M}" for t in sorted(self.times))
+        return f"{self.movie.title} — {self.hall.name} ({times})"
@@ -1,10 +1,45 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Hall, Session, Seat
+from .grid import invalidate_schedule_grid
+from .layout import hall_compact_layout, invalidate_hall_layout
+from .models import Hall, Session, Seat, is_overlap_error
 from apps.movies.models import Movie
 from apps.common.abstract import AbstractSerializer
 
 
+def _describe_session(session):
+    start = timezone.localtime(session.start_time)
+    end = timezone.localtime(session.end_time)
+    return (
+        f"{session.public_id} ({session.movie.title}, "
+        f"{start:%d.%m %H:%M}–{end:%H:%M})"
+    )
+
+
+def overlap_message(session):
+    session.set_end_time()
+    conflict = session.overlapping_sessions().first()
+    if conflict is None:
+        return "Сеанс пересекается с другим сеансом в этом зале"
+    return f"Сеанс пересекается с сеансом {_describe_session(conflict)}"
+
+
+def duration_overlap_message(movie):
+    """Names the first session of ``movie`` its new duration makes overlap."""
+    for session in movie.movie_sessions.order_by("start_time"):
+        session.movie = movie
+        session.set_end_time()
+        conflict = session.overlapping_sessions().first()
+        if conflict is not None:
+            return (
+                f"С новой продолжительностью сеанс {_describe_session(session)} "
+                f"пересечётся с сеансом {_describe_session(conflict)}"
+            )
+    return "С новой продолжительностью сеансы фильма пересекутся с другими"
+
+
 class SeatSerializer(serializers.ModelSerializer):
     class Meta:
         model = Seat
@@ -28,17 +63,28 @@ class HallSerializer(AbstractSerializer, serializers.ModelSerializer):
         fields = ("id", "name", "rows", "seats")
         read_only_fields = ["public_id", "seats"]
 
+    @staticmethod
+    def _layout_coordinates(rows_data):
+        return {
+            (row_data.get("row_number"), seat_num)
+            for row_data in rows_data
+            for seat_num in range(1, row_data.get("seats") + 1)
+        }
+
+    @staticmethod
+    def _create_seats(hall, coordinates):
+        Seat.objects.bulk_create(
+            [
+                Seat(hall=hall, row_number=row_number, seat_number=seat_number)
+                for row_number, seat_number in sorted(coordinates)
+            ]
+        )
+
+    @transaction.atomic
     def create(self, validated_data):
         rows_data = validated_data.pop("rows")
         hall = Hall.objects.create(**validated_data)
-
-        for row_data in rows_data:
-            row_number = row_data.get("row_number")
-            seats_count = row_data.get("seats")
-            for seat_num in range(1, seats_count + 1):
-                Seat.objects.create(
-                    hall=hall, row_number=row_number, seat_number=seat_num
-                )
+        self._create_seats(hall, self._layout_coordinates(rows_data))
 
         return hall
 
@@ -58,6 +104,7 @@ class HallSerializer(AbstractSerializer, serializers.ModelSerializer):
                 )
         return value
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         rows_data = validated_data.pop("rows", None)
 
@@ -65,21 +112,62 @@ class HallSerializer(AbstractSerializer, serializers.ModelSerializer):
         instance = super().update(instance, validated_data)
 
         if rows_data is not None:
-            # удаляем старые места
-            instance.seats.all().delete()
-
-            # создаём новые
-            for row_data in rows_data:
-                row_number = row_data.get("row_number")
-                seats_count = row_data.get("seats")
-                for seat_num in range(1, seats_count + 1):
-                    Seat.objects.create(
-                        hall=instance, row_number=row_number, seat_number=seat_num
-                    )
+            # меняем только добавленные и удалённые места
+            existing = {
+                (row_number, seat_number): seat_id
+                for seat_id, row_number, seat_number in instance.seats.values_list(
+                    "id", "row_number", "seat_number"
+                )
+            }
+            layout = self._layout_coordinates(rows_data)
+            removed = [
+                seat_id
+                for coordinates, seat_id in existing.items()
+                if coordinates not in layout
+            ]
+            added = layout - existing.keys()
+
+            booked = list(
+                Seat.objects.filter(id__in=removed, bookings__isnull=False)
+                .distinct()
+                .values_list("row_number", "seat_number")
+            )
+            if booked:
+                raise serializers.ValidationError(
+                    {
+                        "rows": "Нельзя удалить места с бронированиями: "
+                        + "; ".join(
+                            f"ряд={row_number}, место={seat_number}"
+                            for row_number, seat_number in sorted(booked)
+                        )
+                    }
+                )
+
+            if removed or added:
+                Seat.objects.filter(id__in=removed).delete()
+                self._create_seats(instance, added)
+                # до коммита читатели пересобрали бы кеш из старых мест
+                sessions = list(
+                    instance.hall_sessions.filter(start_time__gte=timezone.now())
+                )
+                transaction.on_commit(lambda: invalidate_hall_layout(instance))
+                transaction.on_commit(lambda: invalidate_schedule_grid(*sessions))
 
         return instance
 
 
+class HallLayoutSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source="public_id", read_only=True)
+    rows = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Hall
+        fields = ("id", "name", "rows")
+
+    def get_rows(self, obj):
+        return hall_compact_layout(obj)
+
+
 class SessionSerializer(AbstractSerializer, serializers.ModelSerializer):
     id = serializers.UUIDField(source="public_id", read_only=True)
     movie = serializers.SlugRelatedField(
@@ -99,3 +187,14 @@ class SessionSerializer(AbstractSerializer, serializers.ModelSerializer):
             "price",
         ]
         read_only_fields = ["public_id"]
+
+    def save(self, **kwargs):
+        # пересечение сеансов в зале ловит ограничение в БД, без сканирования
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as exc:
+            if not is_overlap_error(exc):
+                raise
+            session = self.instance or Session(**self.validated_data, **kwargs)
+            raise serializers.ValidationError({"start_time": overlap_message(session)})
@@ -0,0 +1,99 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .grid import invalidate_schedule_grid
+from .models import Session, ShowtimeTemplate
+
+
+logger = logging.getLogger(__name__)
+
+
+def materialize_template(template, today):
+    """
+    Creates the template's sessions for the days after ``generated_until``
+    up to the rolling horizon with one bulk insert. Slots that would overlap
+    an existing session in the hall are skipped by the exclusion constraint
+    and logged. Returns the number of sessions actually created.
+    """
+    first_day = max(template.start_date, today)
+    if template.generated_until is not None:
+        first_day = max(first_day, template.generated_until + timedelta(days=1))
+    last_day = min(
+        template.end_date, today + timedelta(days=settings.SHOWTIME_HORIZON_DAYS)
+    )
+    if first_day > last_day:
+        return 0
+
+    tz = timezone.get_current_timezone()
+    sessions = []
+    day = first_day
+    while day <= last_day:
+        if day.weekday() in template.weekdays:
+            for start in sorted(template.times):
+                session = Session(
+                    movie=template.movie,
+                    hall=template.hall,
+                    template=template,
+                    start_time=datetime.combine(day, start, tzinfo=tz),
+                    price=template.price,
+                )
+                session.set_end_time()
+                sessions.append(session)
+        day += timedelta(days=1)
+
+    Session.objects.bulk_create(sessions, batch_size=500, ignore_conflicts=True)
+    # ignore_conflicts не возвращает, какие строки вставлены: сверяемся с БД
+    created = set(
+        Session.objects.filter(
+            template=template,
+            start_time__gte=datetime.combine(first_day, time.min, tzinfo=tz),
+            start_time__lt=datetime.combine(
+                last_day + timedelta(days=1), time.min, tzinfo=tz
+            ),
+        ).values_list("start_time", flat=True)
+    )
+    skipped = [session for session in sessions if session.start_time not in created]
+    if skipped:
+        logger.warning(
+            f"Template {template.public_id}: skipped {len(skipped)} slots "
+            f"overlapping other sessions: "
+            + ", ".join(
+                f"{timezone.localtime(session.start_time):%Y-%m-%d %H:%M}"
+                for session in skipped
+            )
+        )
+
+    template.generated_until = last_day
+    template.save(update_fields=["generated_until", "updated_at"])
+    transaction.on_commit(lambda: invalidate_schedule_grid(*sessions))
+    return len(sessions) - len(skipped)
+
+
+@shared_task
+def materialize_showtimes():
+    """
+    Materializes sessions of active templates over the rolling horizon.
+    Each run only touches days not generated yet, so its cost depends on
+    the number of new days, not on the size of the schedule.
+    """
+    today = timezone.localdate()
+    horizon = today + timedelta(days=settings.SHOWTIME_HORIZON_DAYS)
+    templates = ShowtimeTemplate.objects.filter(
+        Q(generated_until__isnull=True) | Q(generated_until__lt=horizon),
+        is_active=True,
+        end_date__gte=today,
+    ).select_related("movie", "hall")
+
+    created = 0
+    for template in templates:
+        with transaction.atomic():
+            created += materialize_template(template, today)
+
+    if created:
+        logger.info(f"Materialized {created} sessions from showtime templates.")
@@ -1,5 +1,8 @@
 import pytest
-from apps.schedule.models import Hall, Seat, Session
+from django.db import IntegrityError, transaction
+from apps.common.tests.utils import explain
+from apps.schedule.models import Hall, Seat, Session, is_overlap_error
+from apps.schedule.views import SessionFilter
 
 
 @pytest.mark.django_db
@@ -38,3 +41,38 @@ class TestScheduleModels:
         with pytest.raises(Exception) as excinfo:
             Seat.objects.create(hall=hall, row_number=2, seat_number=10)
         assert "unique_hall_row_seat" in str(excinfo.value).lower()
+
+    def test_overlap_error_detected_by_constraint_name(self, session: Session):
+        with pytest.raises(IntegrityError) as excinfo, transaction.atomic():
+            Session.objects.create(
+                movie=session.movie,
+                hall=session.hall,
+                start_time=session.start_time,
+                price=session.price,
+            )
+        assert is_overlap_error(excinfo.value)
+
+    def test_other_integrity_errors_are_not_overlaps(self, hall: Hall):
+        Seat.objects.create(hall=hall, row_number=2, seat_number=10)
+        with pytest.raises(IntegrityError) as excinfo, transaction.atomic():
+            Seat.objects.create(hall=hall, row_number=2, seat_number=10)
+        assert not is_overlap_error(excinfo.value)
+
+
+@pytest.mark.django_db
+class TestSessionIndexes:
+    def test_sessions_by_hall_use_index(self, hall: Hall):
+        plan = explain(Session.objects.filter(hall=hall).order_by("start_time"))
+        assert "session_hall_start_idx" in plan
+
+    def test_sessions_by_movie_use_index(self, session: Session):
+        plan = explain(
+            Session.objects.filter(movie=session.movie).order_by("start_time")
+        )
+        assert "session_movie_start_idx" in plan
+
+    def test_sessions_by_date_use_index(self):
+        queryset = SessionFilter(
+            {"date": "2030-03-01"}, queryset=Session.objects.all()
+        ).qs
+        assert "session_start_time_id_idx" in explain(queryset)
@@ -6,6 +6,8 @@ from rest_framework.exceptions import ValidationError
 from apps.schedule.serializer import HallSerializer, SessionSerializer
 from apps.schedule.models import Hall, Seat, Session
 from apps.movies.models import Movie
+from apps.booking.models import Booking
+from apps.users.models import User
 
 
 @pytest.mark.django_db
@@ -88,6 +90,40 @@ class TestHallSerializer:
         assert data["seats"][0]["row_number"] == 1
         assert data["seats"][0]["seat_number"] == 1
 
+    def test_update_hall_changes_only_diff(self, hall: Hall):
+        kept = Seat.objects.create(hall=hall, row_number=1, seat_number=1)
+        Seat.objects.create(hall=hall, row_number=1, seat_number=2)
+
+        data = {"rows": [{"row_number": 1, "seats": 1}, {"row_number": 2, "seats": 2}]}
+        serializer = HallSerializer(instance=hall, data=data, partial=True)
+        assert serializer.is_valid(), serializer.errors
+        serializer.save()
+
+        assert set(hall.seats.values_list("row_number", "seat_number")) == {
+            (1, 1),
+            (2, 1),
+            (2, 2),
+        }
+        assert hall.seats.get(row_number=1, seat_number=1).id == kept.id
+
+    def test_update_hall_refuses_removing_booked_seats(
+        self, hall: Hall, session: Session, user: User
+    ):
+        Seat.objects.create(hall=hall, row_number=1, seat_number=1)
+        booked = Seat.objects.create(hall=hall, row_number=1, seat_number=2)
+        booking = Booking.objects.create(user=user, session=session)
+        booking.seats.add(booked)
+
+        data = {"rows": [{"row_number": 1, "seats": 1}]}
+        serializer = HallSerializer(instance=hall, data=data, partial=True)
+        assert serializer.is_valid(), serializer.errors
+
+        with pytest.raises(ValidationError) as excinfo:
+            serializer.save()
+
+        assert "ряд=1, место=2" in str(excinfo.value)
+        assert hall.seats.count() == 2
+
 
 @pytest.mark.django_db
 class TestSessionSerializer:
@@ -0,0 +1,73 @@
+import pytest
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+
+from apps.movies.models import Movie
+from apps.schedule.models import Hall, Session, ShowtimeTemplate
+from apps.schedule.tasks import materialize_showtimes
+
+
+@pytest.fixture
+def template(db, movie: Movie, hall: Hall) -> ShowtimeTemplate:
+    today = timezone.localdate()
+    return ShowtimeTemplate.objects.create(
+        movie=movie,
+        hall=hall,
+        times=[time(21, 0), time(18, 0)],
+        start_date=today,
+        end_date=today + timedelta(days=20),
+        price=20,
+    )
+
+
+@pytest.mark.django_db
+class TestMaterializeShowtimes:
+    @pytest.fixture(autouse=True)
+    def horizon(self, settings):
+        settings.SHOWTIME_HORIZON_DAYS = 6
+
+    def test_materializes_only_rolling_horizon(self, template):
+        materialize_showtimes()
+
+        template.refresh_from_db()
+        today = timezone.localdate()
+        assert template.generated_until == today + timedelta(days=6)
+        sessions = Session.objects.filter(template=template)
+        assert sessions.count() == 14
+        first = sessions.order_by("start_time").first()
+        assert timezone.localtime(first.start_time).time() == time(18, 0)
+
+    def test_next_run_only_adds_new_days(self, template, settings):
+        materialize_showtimes()
+        materialize_showtimes()
+        assert Session.objects.filter(template=template).count() == 14
+
+        settings.SHOWTIME_HORIZON_DAYS = 8
+        materialize_showtimes()
+
+        template.refresh_from_db()
+        assert template.generated_until == timezone.localdate() + timedelta(days=8)
+        assert Session.objects.filter(template=template).count() == 18
+
+    def test_skips_weekdays_and_overlapping_slots(self, template, movie, hall, caplog):
+        today = timezone.localdate()
+        template.weekdays = [today.weekday()]
+        template.save()
+        manual = Session.objects.create(
+            movie=movie,
+            hall=hall,
+            start_time=datetime.combine(
+                today, time(17, 0), tzinfo=timezone.get_current_timezone()
+            ),
+            price=10,
+        )
+
+        with caplog.at_level("INFO", logger="apps.schedule.tasks"):
+            materialize_showtimes()
+
+        sessions = Session.objects.filter(template=template)
+        assert sessions.count() == 1
+        assert "skipped 1 slots" in caplog.text
+        assert "Materialized 1 sessions" in caplog.text
+        assert timezone.localtime(sessions.get().start_time).time() == time(21, 0)
+        assert Session.objects.filter(pk=manual.pk).exists()
@@ -1,11 +1,19 @@
+import io
+import json
 import pytest
+from unittest.mock import AsyncMock, patch
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from datetime import datetime, timedelta
 import zoneinfo
 
-from apps.schedule.models import Hall, Session
+from apps.booking.models import Booking, BookingStatus
+from apps.booking.tasks import relay_seat_events
+from apps.schedule.models import Hall, Seat, Session
 from apps.movies.models import Movie
 
 
@@ -47,6 +55,49 @@ class TestHallViewSet:
         assert response.data["seats"][0]["row_number"] == 1
         assert response.data["seats"][0]["seat_number"] == 1
 
+    def test_retrieve_hall_compact_layout(self, user, hall):
+        self.client.force_authenticate(user=user)
+        from apps.schedule.models import Seat
+
+        for seat_number in [1, 2, 3]:
+            Seat.objects.create(hall=hall, row_number=1, seat_number=seat_number)
+        for seat_number in [1, 2, 5]:
+            Seat.objects.create(hall=hall, row_number=2, seat_number=seat_number)
+
+        endpoint = self.get_detail_endpoint(hall.public_id)
+        response = self.client.get(endpoint, {"layout": "compact"})
+        assert response.status_code == status.HTTP_200_OK
+        assert "seats" not in response.data
+        assert response.data["rows"] == [
+            {"row_number": 1, "seats": 3},
+            {"row_number": 2, "seats": 3, "runs": [[1, 2], [5, 1]]},
+        ]
+
+    def test_layout_cache_invalidated_on_commit(
+        self, superuser, hall, django_capture_on_commit_callbacks
+    ):
+        self.client.force_authenticate(user=superuser)
+        endpoint = self.get_detail_endpoint(hall.public_id)
+        self.client.put(
+            endpoint,
+            {"name": hall.name, "rows": [{"row_number": 1, "seats": 2}]},
+            format="json",
+        )
+        response = self.client.get(endpoint, {"layout": "compact"})
+        assert response.data["rows"] == [{"row_number": 1, "seats": 2}]
+
+        data = {"name": hall.name, "rows": [{"row_number": 1, "seats": 4}]}
+        with django_capture_on_commit_callbacks() as callbacks:
+            self.client.put(endpoint, data, format="json")
+            # кеш не сбрасывается, пока изменения не закоммичены
+            response = self.client.get(endpoint, {"layout": "compact"})
+            assert response.data["rows"] == [{"row_number": 1, "seats": 2}]
+        for callback in callbacks:
+            callback()
+
+        response = self.client.get(endpoint, {"layout": "compact"})
+        assert response.data["rows"] == [{"row_number": 1, "seats": 4}]
+
     def test_list_halls_empty(self, user):
         Hall.objects.all().delete()
         self.client.force_authenticate(user=user)
@@ -156,7 +207,7 @@ class TestSessionViewSet:
         self.client.force_authenticate(user=user)
         response = self.client.get(self.list_create_endpoint)
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["count"] >= 1
+        assert len(response.data["results"]) >= 1
         assert response.data["results"][0]["id"] == str(session.public_id)
 
     def test_retrieve_session(self, user, session):
@@ -167,12 +218,35 @@ class TestSessionViewSet:
         assert str(response.data["movie"]) == str(session.movie.public_id)
         assert str(response.data["hall"]) == str(session.hall.public_id)
 
+    def test_list_sessions_cursor_pagination(self, user, session, movie, hall):
+        for hours in range(3, 36, 3):
+            Session.objects.create(
+                movie=movie,
+                hall=hall,
+                start_time=session.start_time + timedelta(hours=hours),
+                price=session.price,
+            )
+        self.client.force_authenticate(user=user)
+
+        first = self.client.get(self.list_create_endpoint)
+        assert "count" not in first.data
+        assert len(first.data["results"]) == 10
+        second = self.client.get(first.data["next"])
+        assert len(second.data["results"]) == 2
+        assert second.data["next"] is None
+
+        start_times = [
+            item["start_time"]
+            for item in first.data["results"] + second.data["results"]
+        ]
+        assert start_times == sorted(start_times)
+
     def test_list_sessions_empty(self, user):
         Session.objects.all().delete()
         self.client.force_authenticate(user=user)
         response = self.client.get(self.list_create_endpoint)
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["count"] == 0
+        assert len(response.data["results"]) == 0
         assert response.data["results"] == []
 
     def test_create_session_by_superuser(self, superuser, movie, hall):
@@ -192,6 +266,38 @@ class TestSessionViewSet:
         assert new_session.movie == movie
         assert new_session.hall == hall
 
+    def test_create_overlapping_session_fails(self, superuser, session, movie, hall):
+        self.client.force_authenticate(user=superuser)
+        data = {
+            "movie": str(movie.public_id),
+            "hall": str(hall.public_id),
+            "start_time": (session.start_time + timedelta(minutes=30)).isoformat(),
+            "price": 25.50,
+        }
+        response = self.client.post(self.list_create_endpoint, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(session.public_id) in str(response.data)
+        assert Session.objects.count() == 1
+
+        # сразу после окончания предыдущего сеанса — можно
+        data["start_time"] = session.end_time.isoformat()
+        response = self.client.post(self.list_create_endpoint, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_update_session_into_overlap_fails(self, superuser, session, movie, hall):
+        later = Session.objects.create(
+            movie=movie,
+            hall=hall,
+            start_time=session.start_time + timedelta(hours=5),
+            price=session.price,
+        )
+        self.client.force_authenticate(user=superuser)
+        endpoint = self.get_detail_endpoint(later.public_id)
+        data = {"start_time": (session.start_time + timedelta(hours=1)).isoformat()}
+        response = self.client.patch(endpoint, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(session.public_id) in str(response.data)
+
     def test_update_session_by_superuser(self, superuser, session, movie, hall):
         self.client.force_authenticate(user=superuser)
         endpoint = self.get_detail_endpoint(session.public_id)
@@ -259,7 +365,7 @@ class TestSessionViewSet:
         Session.objects.create(
             movie=other_movie,
             hall=session.hall,
-            start_time=session.start_time + timedelta(hours=1),
+            start_time=session.start_time + timedelta(hours=3),
             price=session.price,
         )
 
@@ -267,7 +373,7 @@ class TestSessionViewSet:
             self.list_create_endpoint, {"movie": movie.public_id}
         )
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["count"] == 1
+        assert len(response.data["results"]) == 1
         assert response.data["results"][0]["id"] == str(session.public_id)
 
     def test_filter_session_by_hall(self, user, session, movie, hall):
@@ -285,7 +391,6 @@ class TestSessionViewSet:
 
         assert response.status_code == status.HTTP_200_OK
 
-        assert response.data["count"] == 1
         assert len(response.data["results"]) == 1
 
         item = response.data["results"][0]
@@ -305,7 +410,37 @@ class TestSessionViewSet:
         response = self.client.get(self.list_create_endpoint, {"date": date_str})
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["count"] == 1
+        assert len(response.data["results"]) == 1
+
+    def test_filter_session_by_date_uses_local_day_bounds(self, user, session):
+        self.client.force_authenticate(user=user)
+        almaty = zoneinfo.ZoneInfo("Asia/Almaty")
+        start_times = [
+            datetime(2030, 3, 1, 0, 0, tzinfo=almaty),
+            datetime(2030, 3, 1, 23, 59, tzinfo=almaty),
+            datetime(2030, 3, 2, 0, 0, tzinfo=almaty),
+            datetime(2030, 2, 28, 23, 59, tzinfo=almaty),
+        ]
+        for number, start_time in enumerate(start_times):
+            Session.objects.create(
+                movie=session.movie,
+                hall=Hall.objects.create(name=f"Hall {number}"),
+                start_time=start_time,
+                price=session.price,
+            )
+
+        response = self.client.get(self.list_create_endpoint, {"date": "2030-03-01"})
+
+        assert response.status_code == status.HTTP_200_OK
+        found = {item["id"] for item in response.data["results"]}
+        expected = {
+            str(public_id)
+            for public_id in Session.objects.filter(
+                start_time__date="2030-03-01"
+            ).values_list("public_id", flat=True)
+        }
+        assert found == expected
+        assert len(found) == 2
 
     def test_filter_session_by_invalid_uuid(self, user):
         self.client.force_authenticate(user=user)
@@ -354,3 +489,190 @@ class TestSessionViewSet:
         endpoint = self.get_detail_endpoint(session.public_id)
         response = self.client.delete(endpoint)
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestScheduleGrid:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("session-grid")
+        cache.clear()
+
+    def test_grid_groups_sessions_with_seat_counts(
+        self, user, session, movie, hall, django_assert_num_queries
+    ):
+        seats = [
+            Seat.objects.create(hall=hall, row_number=1, seat_number=i + 1)
+            for i in range(4)
+        ]
+        later = Session.objects.create(
+            movie=movie,
+            hall=hall,
+            start_time=session.start_time + timedelta(hours=3),
+            price=session.price,
+        )
+        Session.objects.create(
+            movie=movie,
+            hall=hall,
+            start_time=session.start_time + timedelta(days=1),
+            price=session.price,
+        )
+        booking = Booking.objects.create(user=user, session=session)
+        booking.seats.add(seats[0], seats[1])
+        cancelled = Booking.objects.create(
+            user=user, session=later, status=BookingStatus.CANCELLED
+        )
+        cancelled.seats.add(seats[0])
+
+        with django_assert_num_queries(1):
+            response = self.client.get(self.url, {"date": "2030-01-01"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["date"] == "2030-01-01"
+        assert len(response.data["movies"]) == 1
+        movie_data = response.data["movies"][0]
+        assert movie_data["id"] == str(movie.public_id)
+        assert len(movie_data["halls"]) == 1
+        sessions = movie_data["halls"][0]["sessions"]
+        assert [s["id"] for s in sessions] == [
+            str(session.public_id),
+            str(later.public_id),
+        ]
+        assert [(s["free"], s["total"]) for s in sessions] == [(2, 4), (4, 4)]
+
+        with django_assert_num_queries(0):
+            self.client.get(self.url, {"date": "2030-01-01"})
+
+    def test_grid_invalidated_by_seat_changes(self, user, session, hall):
+        seat = Seat.objects.create(hall=hall, row_number=1, seat_number=1)
+        response = self.client.get(self.url, {"date": "2030-01-01"})
+        free = response.data["movies"][0]["halls"][0]["sessions"][0]["free"]
+        assert free == 1
+
+        booking = Booking.objects.create(user=user, session=session)
+        with patch("apps.booking.events.get_channel_layer") as mock_get_channel_layer:
+            mock_get_channel_layer.return_value.send = AsyncMock()
+            booking.hold_seats([seat])
+            relay_seat_events()
+
+        response = self.client.get(self.url, {"date": "2030-01-01"})
+        free = response.data["movies"][0]["halls"][0]["sessions"][0]["free"]
+        assert free == 0
+
+    def test_grid_invalid_date(self):
+        response = self.client.get(self.url, {"date": "01-01-2030"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestSessionImport:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("session-import-sessions")
+
+    def rows(self, movie, halls, start):
+        return [
+            {
+                "movie": str(movie.public_id),
+                "hall": str(hall.public_id),
+                "start_time": (start + timedelta(hours=3 * i)).isoformat(),
+                "price": "20.00",
+            }
+            for hall in halls
+            for i in range(3)
+        ]
+
+    def test_import_json(
+        self, superuser, movie, hall, session, django_assert_max_num_queries
+    ):
+        other_hall = Hall.objects.create(name="Second Hall")
+        rows = self.rows(movie, [hall, other_hall], session.end_time)
+        self.client.force_authenticate(user=superuser)
+
+        with django_assert_max_num_queries(12):
+            response = self.client.post(self.url, rows, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data["ids"]) == 6
+        assert Session.objects.count() == 7
+
+    def test_import_reports_row_errors_and_writes_nothing(
+        self, superuser, movie, hall, session
+    ):
+        rows = self.rows(movie, [hall], session.end_time)
+        rows[1]["start_time"] = rows[0]["start_time"]
+        rows[2]["hall"] = "a1b2c3d4-e5f6-7890-1234-567890abcdef"
+        rows.append({**rows[0], "start_time": session.start_time.isoformat()})
+        rows.append({"movie": str(movie.public_id), "price": "abc"})
+        self.client.force_authenticate(user=superuser)
+
+        response = self.client.post(self.url, {"sessions": rows}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = {error["row"]: error["error"] for error in response.data["errors"]}
+        assert errors[2] == "Пересекается со строкой 1"
+        assert "не найден" in errors[3]
+        assert errors[4] == f"Пересекается с сеансом {session.public_id}"
+        assert "hall" in errors[5]
+        assert Session.objects.count() == 1
+
+    def test_import_rejects_invalid_prices(self, superuser, movie, hall, session):
+        rows = self.rows(movie, [hall], session.end_time)
+        for row, price in zip(rows, ["NaN", "1e12", "0"]):
+            row["price"] = price
+        self.client.force_authenticate(user=superuser)
+
+        response = self.client.post(self.url, rows, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = {error["row"]: error["error"] for error in response.data["errors"]}
+        assert set(errors) == {1, 2, 3}
+        assert all(error.startswith("Неверная цена") for error in errors.values())
+        assert Session.objects.count() == 1
+
+    @pytest.mark.parametrize("body", [5, {"sessions": 5}, "sessions"])
+    def test_import_rejects_non_list_body(self, superuser, body):
+        self.client.force_authenticate(user=superuser)
+
+        response = self.client.post(self.url, body, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["errors"] == [
+            {"row": None, "error": "Ожидается список сеансов"}
+        ]
+
+    def test_import_rejects_non_utf8_file(self, superuser, movie, hall, session):
+        content = "movie,hall,start_time,price\nЗал,Фильм,,\n".encode("cp1251")
+        upload = SimpleUploadedFile("week.csv", content, "text/csv")
+        self.client.force_authenticate(user=superuser)
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "UTF-8" in response.data["errors"][0]["error"]
+
+    def test_import_csv_file(self, superuser, movie, hall, session):
+        rows = self.rows(movie, [hall], session.end_time)
+        content = "movie,hall,start_time,price\n" + "".join(
+            f"{r['movie']},{r['hall']},{r['start_time']},{r['price']}\n" for r in rows
+        )
+        upload = SimpleUploadedFile("week.csv", content.encode(), "text/csv")
+        self.client.force_authenticate(user=superuser)
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Session.objects.count() == 4
+
+    def test_import_by_user_fails(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.post(self.url, [], format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_import_command(self, movie, hall, session, tmp_path):
+        path = tmp_path / "week.json"
+        path.write_text(json.dumps(self.rows(movie, [hall], session.end_time)))
+
+        call_command("import_sessions", str(path), stdout=io.StringIO())
+
+        assert Session.objects.count() == 4
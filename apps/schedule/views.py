@@ -1,13 +1,24 @@
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from uuid import UUID
 from datetime import datetime
 
+from apps.common.pagination import StartTimeCursorPagination
 from apps.common.viewsets import BaseCRUDViewSet
 from django_filters import rest_framework as filters
 from django.db.models import Prefetch
-
-from .serializer import HallSerializer, SessionSerializer
+from django.utils import timezone
+
+from .importer import (
+    SessionImportError,
+    import_sessions,
+    parse_sessions,
+    session_rows,
+)
+from .grid import invalidate_schedule_grid, local_day_bounds, schedule_grid
+from .serializer import HallLayoutSerializer, HallSerializer, SessionSerializer
 from .models import Session, Hall, Seat
 
 
@@ -15,7 +26,20 @@ class HallViewSet(BaseCRUDViewSet):
     serializer_class = HallSerializer
     object_verbose_name = "Сеанс"
 
+    def is_compact_layout(self):
+        return (
+            self.action in ["list", "retrieve"]
+            and self.request.query_params.get("layout") == "compact"
+        )
+
+    def get_serializer_class(self):
+        if self.is_compact_layout():
+            return HallLayoutSerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
+        if self.is_compact_layout():
+            return Hall.objects.all()
         return Hall.objects.prefetch_related(
             Prefetch(
                 "seats", queryset=Seat.objects.order_by("row_number", "seat_number")
@@ -26,22 +50,103 @@ class HallViewSet(BaseCRUDViewSet):
 class SessionFilter(filters.FilterSet):
     movie = filters.UUIDFilter(field_name="movie__public_id")
     hall = filters.UUIDFilter(field_name="hall__public_id")
-    date = filters.DateFilter(field_name="start_time", lookup_expr="date")
+    date = filters.DateFilter(method="filter_date")
 
     class Meta:
         model = Session
         fields = ["movie", "hall", "date"]
 
+    def filter_date(self, queryset, name, value):
+        # полуинтервал [полночь, следующая полночь) в TIME_ZONE вместо DATE()
+        # над start_time, чтобы работал индекс по start_time
+        start, end = local_day_bounds(value)
+        return queryset.filter(start_time__gte=start, start_time__lt=end)
+
 
 class SessionViewSet(BaseCRUDViewSet):
     serializer_class = SessionSerializer
     filter_backends = [filters.DjangoFilterBackend]
     filterset_class = SessionFilter
+    pagination_class = StartTimeCursorPagination
     object_verbose_name = "Сеанс"
 
     def get_queryset(self):
         return Session.objects.select_related("movie", "hall").all()
 
+    def get_permissions(self):
+        if self.action == "import_sessions":
+            return [IsAdminUser()]
+        return super().get_permissions()
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        invalidate_schedule_grid(serializer.instance)
+
+    def perform_update(self, serializer):
+        previous = Session(start_time=serializer.instance.start_time)
+        super().perform_update(serializer)
+        invalidate_schedule_grid(previous, serializer.instance)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        invalidate_schedule_grid(instance)
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_sessions(self, request):
+        """
+        Массовый импорт сеансов: JSON-список (или {"sessions": [...]}) в теле
+        либо файл .csv/.json в поле file. Всё или ничего, с ошибками по строкам.
+        """
+        try:
+            upload = request.FILES.get("file")
+            if upload is not None:
+                fmt = "csv" if upload.name.lower().endswith(".csv") else "json"
+                try:
+                    content = upload.read().decode("utf-8-sig")
+                except UnicodeDecodeError:
+                    raise SessionImportError(
+                        [{"row": None, "error": "Файл должен быть в кодировке UTF-8"}]
+                    )
+                rows = parse_sessions(content, fmt)
+            else:
+                rows = session_rows(request.data)
+            created = import_sessions(rows)
+        except SessionImportError as exc:
+            return Response(
+                {"error": "Импорт не выполнен", "errors": exc.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {
+                "message": f"Импортировано сеансов: {len(created)}",
+                "ids": [str(session.public_id) for session in created],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["get"], url_path="grid")
+    def grid(self, request):
+        """
+        Расписание на день (?date=YYYY-MM-DD, по умолчанию сегодня):
+        сеансы по фильмам и залам с числом свободных и всех мест.
+        """
+        date_str = request.query_params.get("date")
+        if date_str:
+            try:
+                day = datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                return Response(
+                    {
+                        "detail": "Неверный формат даты. Используйте ISO 8601 (YYYY-MM-DD)."
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        else:
+            day = timezone.localdate()
+
+        return Response(schedule_grid(day))
+
     def list(self, request, *args, **kwargs):
         movie = request.query_params.get("movie")
         hall = request.query_params.get("hall")
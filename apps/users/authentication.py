@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+USER_AUTH_CACHE_TIMEOUT = 5 * 60
+CACHED_USER_FIELDS = (
+    "id",
+    "public_id",
+    "email",
+    "username",
+    "role",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+def _user_cache_key(user_id):
+    return f"auth_user_{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user from the shared cache
+    instead of querying Postgres on every request. Only non-secret fields are
+    cached (no password hash); User.save() and delete() drop the entry, so
+    deactivation takes effect on the next request. A cache hit returns a
+    read-only snapshot: reload the user from the database before saving it.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # проверка отзыва сравнивает хеш пароля, который не кешируется
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = _user_cache_key(user_id)
+        fields = cache.get(key)
+        if fields is None:
+            user = super().get_user(validated_token)
+            cache.set(
+                key,
+                {field: getattr(user, field) for field in CACHED_USER_FIELDS},
+                USER_AUTH_CACHE_TIMEOUT,
+            )
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not fields["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        user = self.user_model(**fields)
+        user._state.adding = False
+        user._state.db = "default"
+        return user
@@ -0,0 +1,139 @@
+"""
+Password hashing off the request threads: PBKDF2 runs in a small dedicated
+process pool, and at most PASSWORD_HASH_QUEUE_SIZE hashes may be running or
+queued at once. When the pool is saturated a request fails fast with 503 and
+Retry-After instead of piling up, so auth spikes cannot starve other views.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    check_password,
+    get_hasher,
+    identify_hasher,
+    make_password,
+)
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = None
+_stats = {"in_flight": 0, "rejected": 0}
+_stats_lock = threading.Lock()
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Сервис авторизации перегружен, повторите попытку позже"
+    default_code = "password_hashing_busy"
+
+    def __init__(self):
+        super().__init__()
+        self.wait = settings.PASSWORD_HASH_RETRY_AFTER
+
+
+def _get_executor():
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_QUEUE_SIZE)
+        return _executor
+
+
+def _discard_executor(broken):
+    """Drops a pool whose worker died so the next call starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _release_slot(slots):
+    with _stats_lock:
+        _stats["in_flight"] -= 1
+    slots.release()
+
+
+def _submit(executor, func, args):
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        with _stats_lock:
+            _stats["rejected"] += 1
+        logger.warning(f"Password hashing pool saturated: {pool_stats()}")
+        raise PasswordHashingBusy()
+
+    with _stats_lock:
+        _stats["in_flight"] += 1
+    try:
+        future = executor.submit(func, *args)
+    except BaseException:
+        _release_slot(slots)
+        raise
+    # слот занят, пока задача не завершится, даже если запрос уже ушёл по таймауту
+    future.add_done_callback(lambda _: _release_slot(slots))
+    return future
+
+
+def _run(func, *args):
+    if not settings.PASSWORD_HASH_WORKERS:
+        return func(*args)
+
+    # пул с упавшим воркером пересоздаётся, и хеш повторяется один раз
+    for _ in range(2):
+        executor = _get_executor()
+        try:
+            future = _submit(executor, func, args)
+            return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+        except TimeoutError:
+            raise PasswordHashingBusy()
+        except BrokenProcessPool:
+            logger.error("Password hashing pool broken, restarting it")
+            _discard_executor(executor)
+    raise PasswordHashingBusy()
+
+
+def pool_stats():
+    """Queue depth of the hashing pool: in-flight hashes, capacity, rejections."""
+    with _stats_lock:
+        return {
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "capacity": settings.PASSWORD_HASH_QUEUE_SIZE,
+            **_stats,
+        }
+
+
+def hash_password(raw_password):
+    if raw_password is None:
+        return make_password(None)
+    return _run(make_password, raw_password)
+
+
+def verify_password(raw_password, encoded):
+    return _run(check_password, raw_password, encoded)
+
+
+def password_needs_update(encoded):
+    """Same rehash rule as django.contrib.auth.hashers.check_password."""
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher()
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
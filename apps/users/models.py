@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -10,6 +10,7 @@ from django.core.exceptions import ValidationError
 
 
 from apps.common.abstract import AbstractModel, AbstractManager
+from .hashing import hash_password, password_needs_update, verify_password
 
 
 class UserManager(BaseUserManager, AbstractManager):
@@ -83,6 +84,34 @@ class User(AbstractBaseUser, PermissionsMixin, AbstractModel):
     def __str__(self):
         return self.username
 
+    def set_password(self, raw_password):
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        valid = verify_password(raw_password, self.password)
+        if valid and password_needs_update(self.password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+        return valid
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.invalidate_auth_cache()
+
+    def delete(self, *args, **kwargs):
+        self.invalidate_auth_cache()
+        return super().delete(*args, **kwargs)
+
+    def invalidate_auth_cache(self):
+        from .authentication import invalidate_cached_user
+
+        # и сразу, и после коммита: иначе параллельный запрос может
+        # закешировать ещё не закоммиченное старое состояние
+        invalidate_cached_user(self.pk)
+        transaction.on_commit(lambda: invalidate_cached_user(self.pk))
+
     def is_admin(self):
         return self.role == self.Role.ADMIN
 
@@ -1,7 +1,18 @@
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
 import pytest
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users import hashing
+from apps.users.authentication import CachedJWTAuthentication
+from apps.users.views import LoginRateThrottle
 
 
 @pytest.mark.django_db
@@ -24,6 +35,21 @@ class TestAuthenticationViewSet:
         assert "user" in response.data
         assert response.data["user"]["email"] == data["email"]
 
+    def test_login_rate_limited_per_ip(self, user, monkeypatch):
+        monkeypatch.setitem(LoginRateThrottle.THROTTLE_RATES, "login", "2/min")
+        data = {"email": user.email, "password": "wrong"}
+        for _ in range(2):
+            response = self.client.post(self.login_url, data)
+            assert response.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+
+        # подменённый X-Forwarded-For не даёт обойти лимит
+        response = self.client.post(
+            self.login_url, data, HTTP_X_FORWARDED_FOR="203.0.113.7"
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response["Retry-After"]) > 0
+        assert "Слишком много запросов" in response.data["error"]
+
     def test_login_successfully(self, user):
         data = {"email": user.email, "password": "Barsik_04"}
         response = self.client.post(self.login_url, data)
@@ -52,3 +78,95 @@ class TestAuthenticationViewSet:
 
         assert refresh_response.status_code == status.HTTP_200_OK
         assert "access" in refresh_response.data
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def authenticate(self, user):
+        token = RefreshToken.for_user(user).access_token
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return CachedJWTAuthentication().authenticate(request)
+
+    def test_user_resolved_from_cache(self, user, django_assert_num_queries):
+        cache.clear()
+        with django_assert_num_queries(1):
+            resolved, _ = self.authenticate(user)
+        assert resolved == user
+
+        with django_assert_num_queries(0):
+            resolved, _ = self.authenticate(user)
+        assert resolved.pk == user.pk
+        assert resolved.email == user.email
+        assert resolved.role == user.role
+        assert not resolved.password
+
+    def test_deactivated_user_rejected(self, user, django_capture_on_commit_callbacks):
+        self.authenticate(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(user)
+
+
+@pytest.mark.django_db
+class TestPasswordHashingPool:
+    def setup_method(self):
+        # 5xx из обработчика исключений тестовый клиент иначе пробрасывает
+        self.client = APIClient(raise_request_exception=False)
+        self.login_url = reverse("auth-login-list")
+
+    def test_hash_in_pool(self):
+        encoded = hashing.hash_password("Barsik_04")
+        assert hashing.verify_password("Barsik_04", encoded)
+        assert not hashing.verify_password("wrong", encoded)
+        assert hashing.pool_stats()["in_flight"] == 0
+
+    def test_saturated_pool_returns_503(self, user, monkeypatch):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        monkeypatch.setattr(hashing, "_get_executor", lambda: None)
+        monkeypatch.setattr(hashing, "_slots", slots)
+        rejected = hashing.pool_stats()["rejected"]
+
+        response = self.client.post(
+            self.login_url, {"email": user.email, "password": "Barsik_04"}
+        )
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == "2"
+        assert "error" in response.data
+        assert hashing.pool_stats()["rejected"] == rejected + 1
+
+    def test_broken_pool_is_replaced(self, monkeypatch):
+        class BrokenPool:
+            def submit(self, *args):
+                raise BrokenProcessPool()
+
+            def shutdown(self, **kwargs):
+                pass
+
+        broken = BrokenPool()
+        monkeypatch.setattr(hashing, "_executor", broken)
+
+        encoded = hashing.hash_password("Barsik_04")
+
+        assert hashing.verify_password("Barsik_04", encoded)
+        assert hashing._executor is not broken
+
+    def test_timed_out_hash_keeps_its_slot(self, settings, monkeypatch):
+        hashing.hash_password("warm-up")
+        settings.PASSWORD_HASH_TIMEOUT = 0.05
+        slots = threading.BoundedSemaphore(1)
+        monkeypatch.setattr(hashing, "_slots", slots)
+
+        with pytest.raises(hashing.PasswordHashingBusy):
+            hashing._run(time.sleep, 1)
+        # задача ещё выполняется в пуле, поэтому следующий запрос отклоняется
+        with pytest.raises(hashing.PasswordHashingBusy):
+            hashing._run(time.sleep, 0)
+
+        assert slots.acquire(timeout=5)
+        slots.release()
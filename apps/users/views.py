@@ -6,17 +6,23 @@ from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from rest_framework_simplejwt.views import TokenRefreshView
-from rest_framework.throttling import UserRateThrottle
+
+from apps.common.throttling import IPRateThrottle, RateLimitedMixin
 
 from .serializer import RegisterSerializer, LoginSerializer
 
 
-class BookingRateThrottle(UserRateThrottle):
-    scope = "user"
+class RegisterRateThrottle(IPRateThrottle):
+    scope = "register"
+
+
+class LoginRateThrottle(IPRateThrottle):
+    scope = "login"
 
 
-class RegisterViewSet(ViewSet):
+class RegisterViewSet(RateLimitedMixin, ViewSet):
     permission_classes = [AllowAny]
+    throttle_classes = [RegisterRateThrottle]
     serializer_class = RegisterSerializer
     http_method_names = ["post"]
 
@@ -40,9 +46,10 @@ class RegisterViewSet(ViewSet):
         )
 
 
-class LoginViewSet(ViewSet):
+class LoginViewSet(RateLimitedMixin, ViewSet):
     serializer_class = LoginSerializer
     permission_classes = (AllowAny,)
+    throttle_classes = [LoginRateThrottle]
     http_method_names = ["post"]
 
     def create(self, request, *args, **kwargs):
@@ -1,6 +1,6 @@
 import os
 from channels.auth import AuthMiddlewareStack
-from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.routing import ChannelNameRouter, ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
 import apps.booking.routing
 
@@ -12,5 +12,6 @@ application = ProtocolTypeRouter(
         "websocket": AuthMiddlewareStack(
             URLRouter(apps.booking.routing.websocket_urlpatterns)
         ),
+        "channel": ChannelNameRouter(apps.booking.routing.channel_routes),
     }
 )
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "drf_yasg",
     "rest_framework",
     "rest_framework_simplejwt",
@@ -143,7 +144,7 @@ AUTH_USER_MODEL = "users.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "UNAUTHENTICATED_USER": "django.contrib.auth.models.AnonymousUser",
@@ -152,12 +153,18 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.BrowsableAPIRenderer",
     ),
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
+        "apps.common.throttling.UserRedisThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": "1000/day",
         "booking": "2/min",
+        "payment": "10/min",
+        "login": "10/min",
+        "register": "5/min",
     },
+    # доверенные прокси перед приложением: при 0 X-Forwarded-For игнорируется
+    # и лимиты по IP считаются по REMOTE_ADDR
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
     "EXCEPTION_HANDLER": "apps.common.exception.custom_exception_handler",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
@@ -188,10 +195,27 @@ CHANNEL_LAYERS = {
             "hosts": [
                 ("redis", 6379),
             ],
+            "channel_capacity": {
+                "seat-broadcast": 10000,
+            },
         },
     }
 }
 
+SEAT_BROADCAST_CHANNEL = "seat-broadcast"
+SEAT_BROADCAST_WINDOW = 0.1
+SEAT_EVENT_RELAY_INTERVAL = 5
+SEAT_EVENT_RELAY_BATCH = 200
+
+# Password hashing runs in its own bounded process pool (0 workers = inline)
+PASSWORD_HASH_WORKERS = env.int("PASSWORD_HASH_WORKERS", default=2)
+PASSWORD_HASH_QUEUE_SIZE = 16
+PASSWORD_HASH_TIMEOUT = 10
+PASSWORD_HASH_RETRY_AFTER = 2
+
+# Rolling horizon for sessions materialized from showtime templates
+SHOWTIME_HORIZON_DAYS = 14
+
 
 REDIS_HOST = os.environ.get("REDIS_HOST", "redis")
 REDIS_PORT = os.environ.get("REDIS_PORT", "6379")
@@ -207,6 +231,13 @@ CACHES = {
 }
 
 
+# Short-lived seat state (holds, seat maps) kept directly in Redis
+REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/2"
+BOOKING_HOLD_MINUTES = 15
+BOOKING_EXPIRY_SWEEP_INTERVAL = 5
+BOOKING_EXPIRY_SWEEP_BATCH = 500
+
+
 # Logginq
 LOGGING = {
     "version": 1,
@@ -270,6 +301,18 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULE = {
+    "sweep_expired_bookings": {
+        "task": "apps.booking.tasks.sweep_expired_bookings",
+        "schedule": timedelta(seconds=BOOKING_EXPIRY_SWEEP_INTERVAL),
+    },
+    "relay_seat_events": {
+        "task": "apps.booking.tasks.relay_seat_events",
+        "schedule": timedelta(seconds=SEAT_EVENT_RELAY_INTERVAL),
+    },
+    "materialize_showtimes": {
+        "task": "apps.schedule.tasks.materialize_showtimes",
+        "schedule": crontab(hour=4, minute=0),
+    },
     "check_expired_bookings_daily": {
         "task": "apps.booking.tasks.check_all_expired_bookings",
         "schedule": crontab(hour=3, minute=0),